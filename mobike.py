@@ -0,0 +1,58 @@
+"""
+Mobike: ponto de entrada único de linha de comando.
+
+Uso (a partir da raiz do projeto):
+    python mobike.py fetch                           # coleta a previsão da API Open-Meteo
+    python mobike.py preprocess                      # pré-processa os location_*_raw.json
+    python mobike.py train [arvore logistica mlp]    # treina e salva os modelos
+    python mobike.py score                           # atualiza a tabela de risco
+    python mobike.py score --consultar "Av. Afonso Pena - Belo Horizonte" 18
+    python mobike.py bench --tamanhos 1000 10000     # benchmarks com dados sintéticos
+    python mobike.py pipeline                        # roda só o que estiver desatualizado
+    python mobike.py COMANDO --help                  # opções de cada comando
+
+Cada comando repassa os argumentos para o `main(argv)` do módulo que o
+implementa, então as opções são as mesmas de `python -m <módulo>`. Este
+arquivo importa apenas a biblioteca padrão: o módulo (e com ele pandas,
+scikit-learn ou TensorFlow) só é importado quando o comando roda, para que
+`--help` e consultas à tabela abram rápido (confira com
+`python -X importtime mobike.py --help`).
+"""
+
+import argparse
+import importlib
+import sys
+
+# comando → (módulo com main(argv, prog), argumentos fixos, ajuda)
+COMANDOS = {
+    'fetch': ('src.prepocessing.fetch_weather_data', [], "coleta a previsão horária das estações"),
+    'preprocess': ('src.prepocessing.preprocess', ['--todas'], "limpeza e features das previsões coletadas"),
+    'train': ('src.models.registry', [], "treina e salva os modelos"),
+    # a CLI de materialize.py fica em tabela.py, que só importa pandas ao atualizar a tabela
+    'score': ('src.scoring.tabela', [], "atualiza ou consulta a tabela de risco por ciclovia e hora"),
+    'bench': ('src.benchmark.run_benchmarks', [], "benchmarks por estágio com dados sintéticos"),
+    'pipeline': ('src.pipeline', [], "roda coleta → pré-processamento → treino → tabela, "
+                                     "pulando o que não mudou"),
+}
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog='mobike', description="Previsão de risco para ciclistas.",
+        epilog="comandos:\n" + "\n".join(f"  {nome:<11} {ajuda}" for nome, (_, _, ajuda) in COMANDOS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('comando', choices=COMANDOS, metavar='COMANDO', help="um dos comandos abaixo")
+    parser.add_argument('argumentos', nargs=argparse.REMAINDER,
+                        help="repassados ao comando (veja `mobike COMANDO --help`)")
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    modulo, fixos, _ = COMANDOS[args.comando]
+    importlib.import_module(modulo).main(fixos + args.argumentos, prog=f"mobike {args.comando}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,267 @@
+"""
+Suíte de benchmarks ponta a ponta com dados sintéticos.
+
+Para cada tamanho (10^3 a 10^7 linhas) mede tempo e pico de memória de cada
+estágio: carga (`load_data`), limpeza (`clean_data`), features
+(`feature_engineering`), treino e predição de cada modelo. Os resultados vão
+para `data/benchmarks/` em JSON, com a versão do código (commit git) e das
+bibliotecas, para que regressões apareçam comparando duas execuções.
+
+Uso (a partir da raiz do projeto):
+    python -m src.benchmark.run_benchmarks --tamanhos 1000 10000 100000 1000000
+    python -m src.benchmark.run_benchmarks --comparar data/benchmarks/bench_ANTERIOR.json
+
+O pico de memória é o medido pelo tracemalloc (objetos Python e arrays NumPy),
+em uma execução separada da cronometrada; alocações nativas do TensorFlow não
+entram nessa conta. Como o tracemalloc deixa o treino da árvore bem mais lento,
+use --sem-memoria para rodadas rápidas só de tempo.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from src.benchmark.synthetic import SEED_PADRAO, gerar_ciclovias, gerar_historico
+
+# --- CONFIGURAÇÕES ---
+DIRETORIO_RESULTADOS = os.path.join('data', 'benchmarks')
+TAMANHOS_PADRAO = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+MAX_LINHAS_TREINO = 50_000  # a árvore leva ~150 µs/linha para treinar (bem mais sob tracemalloc)
+EPOCAS_MLP = 5
+LIMIAR_REGRESSAO = 1.20     # tempo atual / anterior acima disso é sinalizado
+
+ESTAGIOS = [
+    'carga', 'limpeza', 'features',
+    'treino_arvore', 'treino_logistica', 'treino_mlp',
+    'predicao_arvore', 'predicao_logistica', 'predicao_mlp',
+]
+
+
+def medir(funcao, repeticoes=1, memoria=True):
+    """
+    Executa `funcao` `repeticoes` vezes (saída padrão silenciada) e retorna
+    (resultado, métricas): melhor tempo, todos os tempos e pico de memória em MB.
+    """
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        with contextlib.redirect_stdout(io.StringIO()):
+            inicio = time.perf_counter()
+            resultado = funcao()
+            tempos.append(time.perf_counter() - inicio)
+
+    pico_mb = None
+    if memoria:
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                funcao()
+            pico_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return resultado, {'tempo_s': min(tempos), 'tempos_s': tempos, 'pico_memoria_mb': pico_mb}
+
+
+def versoes():
+    """Commit git e versões de Python e das bibliotecas usadas."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    bibliotecas = {}
+    for nome in ('numpy', 'pandas', 'sklearn', 'tensorflow'):
+        try:
+            bibliotecas[nome] = __import__(nome).__version__
+        except ImportError:
+            bibliotecas[nome] = None
+    return {'git': commit, 'python': platform.python_version(),
+            'plataforma': platform.platform(), 'bibliotecas': bibliotecas}
+
+
+def _tensorflow_disponivel():
+    try:
+        import tensorflow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def benchmark_tamanho(n, estagios=ESTAGIOS, repeticoes=1, memoria=True,
+                      max_treino=MAX_LINHAS_TREINO, epocas_mlp=EPOCAS_MLP, seed=SEED_PADRAO):
+    """Roda os estágios pedidos com n linhas e retorna uma lista de resultados."""
+    from src.models import decision_tree as dt
+    from src.models import logistic_regression as lr
+    from src.models.registry import ModeloRisco
+    from src.prepocessing.preprocess import clean_data, feature_engineering, load_data
+
+    resultados = []
+
+    def registrar(estagio, linhas, metricas, **extra):
+        linhas_por_s = linhas / metricas['tempo_s'] if metricas['tempo_s'] else None
+        resultados.append({'linhas': n, 'estagio': estagio, 'linhas_processadas': linhas,
+                           'linhas_por_s': linhas_por_s, **metricas, **extra})
+        memoria_txt = (f" | pico {metricas['pico_memoria_mb']:.1f} MB"
+                       if metricas['pico_memoria_mb'] is not None else "")
+        print(f"  {estagio:<20} {metricas['tempo_s']:>9.4f} s | {linhas_por_s or 0:>14,.0f} linhas/s{memoria_txt}")
+
+    def pular(estagio, motivo):
+        resultados.append({'linhas': n, 'estagio': estagio, 'pulado': motivo})
+        print(f"  {estagio:<20} pulado ({motivo})")
+
+    # --- pré-processamento: uma estação com n horas, como preprocess.py usa ---
+    if {'carga', 'limpeza', 'features'} & set(estagios):
+        with tempfile.TemporaryDirectory() as tmp:
+            caminho = os.path.join(tmp, 'historico.csv')
+            gerar_historico(1, n, seed=seed).drop(columns='location_id').to_csv(caminho, index=False)
+            df, m = medir(lambda: load_data(caminho), repeticoes, memoria)
+            if 'carga' in estagios:
+                registrar('carga', n, m, bytes_arquivo=os.path.getsize(caminho))
+        df_limpo, m = medir(lambda: clean_data(df), repeticoes, memoria)
+        if 'limpeza' in estagios:
+            registrar('limpeza', n, m)
+        if 'features' in estagios:
+            _, m = medir(lambda: feature_engineering(df_limpo), repeticoes, memoria)
+            registrar('features', n, m)
+
+    modelos_pedidos = {e.split('_', 1)[1] for e in estagios if e.startswith(('treino_', 'predicao_'))}
+    if not modelos_pedidos:
+        return resultados
+
+    # --- modelos: dataset rotulado com n linhas; treino limitado a max_treino ---
+    dados = gerar_ciclovias(n, seed=seed, com_identificacao=False)
+    n_treino = min(n, max_treino)
+    X_arvore, y_arvore = dt.preparar_features(dados.iloc[:n_treino].copy())
+    X_bin, y_bin = lr.preparar_features(dados.iloc[:n_treino].copy())
+    X_todos = X_arvore if n_treino == n else dt.preparar_features(dados.copy())[0]
+    extra_treino = {'linhas_treino': n_treino}
+
+    modelos = {}
+    if 'arvore' in modelos_pedidos:
+        arvore, m = medir(lambda: dt.construir_arvore_decisao(X_arvore, y_arvore, prof_max=5,
+                                                              min_amostras_folha=2), 1, memoria)
+        if 'treino_arvore' in estagios:
+            registrar('treino_arvore', n_treino, m, **extra_treino)
+        modelos['arvore'] = ModeloRisco('arvore', arvore)
+
+    if 'logistica' in modelos_pedidos:
+        pipe, m = medir(lambda: lr.treinar_regressao_logistica(X_bin, y_bin, seed=seed, max_iter=2000),
+                        1, memoria)
+        if 'treino_logistica' in estagios:
+            registrar('treino_logistica', n_treino, m, **extra_treino)
+        modelos['logistica'] = ModeloRisco('logistica', pipe)
+
+    if 'mlp' in modelos_pedidos:
+        if not _tensorflow_disponivel():
+            for estagio in ('treino_mlp', 'predicao_mlp'):
+                if estagio in estagios:
+                    pular(estagio, 'tensorflow indisponível')
+        else:
+            from sklearn.preprocessing import StandardScaler
+            from src.models import mlp
+            y_mlp = dados['rótulo'].iloc[:n_treino].map({'Baixo': 0.0, 'Médio': 0.5, 'Alto': 1.0})
+
+            def treinar_mlp():
+                scaler = StandardScaler()
+                rede = mlp.construir_modelo(X_arvore.shape[1])
+                rede.fit(scaler.fit_transform(X_arvore), y_mlp, epochs=epocas_mlp, batch_size=16, verbose=0)
+                return rede, scaler
+
+            # Sem tracemalloc: as alocações da rede são nativas
+            (rede, scaler), m = medir(treinar_mlp, 1, memoria=False)
+            if 'treino_mlp' in estagios:
+                registrar('treino_mlp', n_treino, m, epocas=epocas_mlp, **extra_treino)
+            modelos['mlp'] = ModeloRisco('mlp', rede, scaler=scaler)
+
+    for nome, modelo in modelos.items():
+        estagio = f'predicao_{nome}'
+        if estagio in estagios:
+            _, m = medir(lambda: modelo.prever_risco(X_todos), repeticoes, memoria and nome != 'mlp')
+            registrar(estagio, n, m)
+    return resultados
+
+
+def executar(tamanhos=TAMANHOS_PADRAO, estagios=ESTAGIOS, repeticoes=1, memoria=True,
+             max_treino=MAX_LINHAS_TREINO, epocas_mlp=EPOCAS_MLP, seed=SEED_PADRAO):
+    relatorio = {
+        'data': datetime.now().isoformat(),
+        'versao': versoes(),
+        'config': {'tamanhos': list(tamanhos), 'estagios': list(estagios), 'repeticoes': repeticoes,
+                   'max_linhas_treino': max_treino, 'epocas_mlp': epocas_mlp, 'seed': seed},
+        'resultados': [],
+    }
+    for n in tamanhos:
+        print(f"\n{n:,} linhas")
+        relatorio['resultados'] += benchmark_tamanho(n, estagios, repeticoes, memoria,
+                                                     max_treino, epocas_mlp, seed)
+    return relatorio
+
+
+def salvar_relatorio(relatorio, diretorio=DIRETORIO_RESULTADOS):
+    os.makedirs(diretorio, exist_ok=True)
+    carimbo = datetime.now().strftime('%Y%m%d_%H%M%S')
+    commit = relatorio['versao']['git'] or 'sem_git'
+    caminho = os.path.join(diretorio, f"bench_{carimbo}_{commit}.json")
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados salvos em {caminho}")
+    return caminho
+
+
+def comparar(atual, anterior, limiar=LIMIAR_REGRESSAO):
+    """Imprime a razão de tempo atual/anterior por (linhas, estágio) e retorna as regressões."""
+    def indexar(relatorio):
+        return {(r['linhas'], r['estagio']): r for r in relatorio['resultados'] if 'tempo_s' in r}
+
+    idx_atual, idx_anterior = indexar(atual), indexar(anterior)
+    print(f"\nComparação com {anterior['versao'].get('git')} ({anterior['data']}):")
+    regressoes = []
+    for chave in sorted(idx_atual.keys() & idx_anterior.keys()):
+        razao = idx_atual[chave]['tempo_s'] / idx_anterior[chave]['tempo_s']
+        marca = ''
+        if razao > limiar:
+            marca = '  <-- REGRESSÃO'
+            regressoes.append({'linhas': chave[0], 'estagio': chave[1], 'razao_tempo': razao})
+        print(f"  {chave[0]:>10,} {chave[1]:<20} {razao:6.2f}x{marca}")
+    return regressoes
+
+
+def criar_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Benchmarks de carga, pré-processamento, treino e predição.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO)
+    parser.add_argument('--estagios', nargs='+', default=ESTAGIOS, help=f"padrão: {' '.join(ESTAGIOS)}")
+    parser.add_argument('--repeticoes', type=int, default=1, help="melhor de N execuções")
+    parser.add_argument('--max-treino', type=int, default=MAX_LINHAS_TREINO)
+    parser.add_argument('--epocas-mlp', type=int, default=EPOCAS_MLP)
+    parser.add_argument('--sem-memoria', action='store_true', help="não mede pico de memória")
+    parser.add_argument('--seed', type=int, default=SEED_PADRAO)
+    parser.add_argument('--saida', default=DIRETORIO_RESULTADOS)
+    parser.add_argument('--comparar', help="JSON de uma execução anterior")
+    return parser
+
+
+def main(argv=None, prog=None):
+    parser = criar_parser(prog)
+    args = parser.parse_args(argv)
+    desconhecidos = set(args.estagios) - set(ESTAGIOS)
+    if desconhecidos:
+        parser.error(f"estágios desconhecidos: {', '.join(sorted(desconhecidos))}")
+
+    relatorio = executar(args.tamanhos, args.estagios, args.repeticoes, not args.sem_memoria,
+                         args.max_treino, args.epocas_mlp, args.seed)
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            relatorio['regressoes'] = comparar(relatorio, json.load(f))
+    salvar_relatorio(relatorio, args.saida)
+
+
+if __name__ == '__main__':
+    main()
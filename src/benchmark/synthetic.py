@@ -0,0 +1,167 @@
+"""
+Gerador determinístico de dados sintéticos em escala.
+
+- `gerar_ciclovias(n)`: dataset rotulado no formato de `data/raw/ciclovias.csv`
+  (NOME_LOGRADOURO, COORDENADAS, 6 features, rótulo). As distribuições de
+  cada classe seguem as do CSV original: código WMO por classe, chuva
+  acumulada ≈ 3 × precipitação e rajada ≈ 1,37 × vento.
+- `gerar_historico(n_estacoes, n_horas)`: séries horárias no formato da API
+  Open-Meteo (temperatura com ciclo diário, eventos de chuva, vento), prontas
+  para `preprocess.py` ou para virar `location_*_raw.json`.
+
+A mesma seed sempre gera os mesmos dados.
+
+Uso (a partir da raiz do projeto):
+    python -m src.benchmark.synthetic ciclovias --linhas 1000000 --saida /tmp/ciclovias_1M.csv
+    python -m src.benchmark.synthetic historico --estacoes 50 --horas 8760 --saida /tmp/raw_50
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURAÇÕES ---
+SEED_PADRAO = 42
+CENTRO_BH = (-19.92, -43.95)
+CLASSES = np.array(['Baixo', 'Médio', 'Alto'])
+PROPORCAO_CLASSES = [0.40, 0.24, 0.36]  # proporções de ciclovias.csv
+
+# Código WMO por classe: (valores, probabilidades)
+CODIGOS_POR_CLASSE = {
+    'Baixo': ([0, 1, 2], [0.22, 0.49, 0.29]),
+    'Médio': ([0, 3], [0.05, 0.95]),
+    'Alto': ([3, 4, 5], [0.03, 0.45, 0.52]),
+}
+
+
+def gerar_ciclovias(n, seed=SEED_PADRAO, com_identificacao=True):
+    """
+    Dataset rotulado de n ciclovias sintéticas, com as colunas de ciclovias.csv.
+    `com_identificacao=False` omite NOME_LOGRADOURO e COORDENADAS (montar as
+    strings domina o tempo de geração em 10^7 linhas).
+    """
+    rng = np.random.default_rng(seed)
+    rotulo = rng.choice(CLASSES, size=n, p=PROPORCAO_CLASSES)
+
+    weather_code = np.empty(n, dtype=np.int64)
+    vento = np.empty(n)
+    precipitacao = np.empty(n)
+    for classe in CLASSES:
+        mascara = rotulo == classe
+        k = int(mascara.sum())
+        codigos, probs = CODIGOS_POR_CLASSE[classe]
+        weather_code[mascara] = rng.choice(codigos, size=k, p=probs)
+        if classe == 'Baixo':
+            vento[mascara] = rng.gamma(2.0, 3.5, k)
+            precipitacao[mascara] = np.where(rng.random(k) < 0.7, 0.0, rng.uniform(0, 0.5, k))
+        elif classe == 'Médio':
+            vento[mascara] = rng.gamma(2.0, 4.5, k)
+            precipitacao[mascara] = rng.uniform(0, 4.1, k)
+        else:
+            vento[mascara] = np.clip(rng.normal(30, 9, k), 1.5, None)
+            precipitacao[mascara] = rng.uniform(2.5, 20, k)
+
+    lat = CENTRO_BH[0] + rng.uniform(-0.08, 0.08, n)
+    lon = CENTRO_BH[1] + rng.uniform(-0.10, 0.10, n)
+    df = pd.DataFrame({
+        'weather_code': weather_code,
+        'wind_speed_10m': vento.round(1),
+        'precipitation': precipitacao.round(2),
+        'sensacao_termica': rng.normal(25, 4, n).round(1),
+        'chuva_acumulada_3h': np.clip(precipitacao * rng.normal(3.0, 0.15, n), 0, None).round(2),
+        'rajada_maxima_3h': np.clip(vento * rng.normal(1.37, 0.1, n), 0, None).round(1),
+        'rótulo': rotulo,
+    })
+    if com_identificacao:
+        df.insert(0, 'NOME_LOGRADOURO', [f"Ciclovia Sintética {i:08d}" for i in range(n)])
+        df.insert(1, 'COORDENADAS', [f"{a:.6f}, {b:.6f}" for a, b in zip(lat, lon)])
+    return df
+
+
+def gerar_historico(n_estacoes, n_horas, inicio='2025-01-01T00:00', seed=SEED_PADRAO):
+    """
+    Histórico horário de n_estacoes × n_horas no formato das variáveis da API
+    (time, temperature_2m, relative_humidity_2m, weather_code, wind_speed_10m,
+    precipitation), com a coluna location_id identificando a estação.
+    """
+    rng = np.random.default_rng(seed)
+    forma = (n_estacoes, n_horas)
+    hora_do_dia = (np.arange(n_horas) + pd.Timestamp(inicio).hour) % 24
+
+    # Chuva em eventos: começam com prob. 4%/h e duram Geométrica(0,25) horas (média 4h);
+    # marca +1 no início e -1 no fim de cada evento e acumula
+    inicios = rng.random(forma) < 0.04
+    estacao, hora = np.nonzero(inicios)
+    fim = np.minimum(hora + rng.geometric(0.25, len(hora)), n_horas)
+    marcas = np.zeros((n_estacoes, n_horas + 1), dtype=np.int64)
+    np.add.at(marcas, (estacao, hora), 1)
+    np.add.at(marcas, (estacao, fim), -1)
+    chovendo = np.cumsum(marcas, axis=1)[:, :n_horas] > 0
+    precipitacao = np.where(chovendo, rng.gamma(0.8, 2.5, forma), 0.0)
+
+    base = rng.normal(22, 3, (n_estacoes, 1))
+    temperatura = (base + 5 * np.sin(2 * np.pi * (hora_do_dia - 9) / 24)
+                   - 2 * chovendo + rng.normal(0, 0.8, forma))
+    umidade = np.clip(75 - 2.5 * (temperatura - base) + 15 * chovendo + rng.normal(0, 5, forma), 15, 100)
+    vento = np.clip(rng.gamma(2.0, 3.0, forma) + chovendo * rng.gamma(2.0, 6.0, forma), 0, None)
+
+    nublado = rng.choice([0, 1, 2], size=forma, p=[0.4, 0.35, 0.25])
+    weather_code = np.where(precipitacao >= 5, 5, np.where(precipitacao >= 1, 4,
+                            np.where(precipitacao > 0, 3, nublado)))
+
+    tempos = pd.date_range(inicio, periods=n_horas, freq='h')
+    ids = np.array([f"location_{i + 1:03d}" for i in range(n_estacoes)])
+    return pd.DataFrame({
+        'location_id': np.repeat(ids, n_horas),
+        'time': np.tile(tempos, n_estacoes),
+        'temperature_2m': temperatura.ravel().round(1),
+        'relative_humidity_2m': umidade.ravel().round().astype(np.int64),
+        'weather_code': weather_code.ravel(),
+        'wind_speed_10m': vento.ravel().round(1),
+        'precipitation': precipitacao.ravel().round(2),
+    })
+
+
+def salvar_historico_raw(historico, diretorio, seed=SEED_PADRAO):
+    """Grava um `location_XXX_raw.json` por estação, no formato salvo por fetch_weather_data.py."""
+    os.makedirs(diretorio, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    variaveis = ['temperature_2m', 'relative_humidity_2m', 'weather_code', 'wind_speed_10m', 'precipitation']
+    for location_id, df in historico.groupby('location_id', sort=True):
+        dados = {
+            'latitude': round(CENTRO_BH[0] + rng.uniform(-0.1, 0.1), 4),
+            'longitude': round(CENTRO_BH[1] + rng.uniform(-0.15, 0.15), 4),
+            'timezone': 'America/Sao_Paulo',
+            'hourly': {'time': df['time'].dt.strftime('%Y-%m-%dT%H:%M').tolist(),
+                       **{v: df[v].tolist() for v in variaveis}},
+            'location_id': location_id,
+            'location_name': f"Estação sintética {location_id}",
+            'forecast_hours': len(df),
+        }
+        with open(os.path.join(diretorio, f"{location_id}_raw.json"), 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos em escala.")
+    sub = parser.add_subparsers(dest='tipo', required=True)
+    p_cic = sub.add_parser('ciclovias', help="dataset rotulado no formato de ciclovias.csv")
+    p_cic.add_argument('--linhas', type=int, default=100_000)
+    p_cic.add_argument('--saida', required=True, help="arquivo CSV")
+    p_hist = sub.add_parser('historico', help="location_*_raw.json horários por estação")
+    p_hist.add_argument('--estacoes', type=int, default=10)
+    p_hist.add_argument('--horas', type=int, default=24 * 365)
+    p_hist.add_argument('--saida', required=True, help="diretório")
+    for p in (p_cic, p_hist):
+        p.add_argument('--seed', type=int, default=SEED_PADRAO)
+    args = parser.parse_args()
+
+    if args.tipo == 'ciclovias':
+        gerar_ciclovias(args.linhas, args.seed).to_csv(args.saida, index=False)
+        print(f"{args.linhas:,} ciclovias sintéticas salvas em {args.saida}")
+    else:
+        salvar_historico_raw(gerar_historico(args.estacoes, args.horas, seed=args.seed), args.saida, args.seed)
+        print(f"{args.estacoes} estações × {args.horas} horas salvas em {args.saida}")
@@ -0,0 +1,388 @@
+"""
+Instrumentação por estágio: tempo, linhas, bytes e memória de cada chamada.
+
+Os estágios do pipeline (`fetch_station_data`, `load_data`, `clean_data`,
+`feature_engineering`, `construir_arvore_decisao` e `ModeloRisco.prever_risco`)
+são decorados com `@instrumentado`. Desligada, a instrumentação custa uma
+verificação por chamada; ligada, cada chamada vira um registro com duração,
+linhas processadas, RSS máximo do processo e o que o estágio anotar com
+`anotar()` (ex.: bytes baixados).
+
+Configuração por variáveis de ambiente (ou `configurar()`):
+    MOBIKE_METRICAS=data/metricas.jsonl    uma linha JSON por chamada
+    MOBIKE_METRICAS=data/metricas.prom     formato texto do Prometheus (acumulado)
+    MOBIKE_METRICAS_MEMORIA=1              pico de memória via tracemalloc (mais lento)
+    MOBIKE_PERFIL=construir_arvore         perfila só esse estágio...
+    MOBIKE_PERFIL_MODO=cprofile|amostragem ...com cProfile (.pstats) ou por amostragem
+                                           de pilhas (.folded, formato de flamegraph)
+
+Uso (a partir da raiz do projeto):
+    MOBIKE_METRICAS=data/metricas.jsonl python -m src.scoring.materialize
+    MOBIKE_PERFIL=prever_risco MOBIKE_PERFIL_MODO=amostragem python -m src.scoring.service
+    python -m src.instrumentation data/metricas.jsonl     # resumo por estágio
+"""
+
+import argparse
+import atexit
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# --- CONFIGURAÇÕES ---
+DIRETORIO_PERFIS = os.path.join('data', 'perfis')
+INTERVALO_AMOSTRAGEM_S = 0.005
+INTERVALO_PROMETHEUS_S = 1.0  # o arquivo .prom é reescrito no máximo uma vez por intervalo
+
+
+class _Config:
+    destino = None
+    memoria = False
+    perfil = None
+    modo_perfil = 'cprofile'
+    diretorio_perfis = DIRETORIO_PERFIS
+
+
+_config = _Config()
+_local = threading.local()
+_coletor = None
+
+
+def configurar(destino=None, memoria=None, perfil=None, modo_perfil=None,
+               diretorio_perfis=None):
+    """
+    Liga/ajusta a instrumentação. `destino`: arquivo .jsonl ou .prom (None
+    desliga os registros). `perfil`: nome do estágio a perfilar.
+    """
+    global _coletor
+    if _coletor is not None:
+        _coletor.fechar()
+        _coletor = None
+    _config.destino = destino
+    if destino:
+        _coletor = ColetorPrometheus(destino) if destino.endswith('.prom') else ColetorJsonl(destino)
+    if memoria is not None:
+        _config.memoria = memoria
+    _config.perfil = perfil
+    if modo_perfil is not None:
+        if modo_perfil not in ('cprofile', 'amostragem'):
+            raise ValueError(f"Modo de perfil desconhecido: {modo_perfil} (opções: cprofile, amostragem)")
+        _config.modo_perfil = modo_perfil
+    if diretorio_perfis is not None:
+        _config.diretorio_perfis = diretorio_perfis
+
+
+def _configurar_do_ambiente():
+    configurar(destino=os.environ.get('MOBIKE_METRICAS') or None,
+               memoria=os.environ.get('MOBIKE_METRICAS_MEMORIA', '') not in ('', '0'),
+               perfil=os.environ.get('MOBIKE_PERFIL') or None,
+               modo_perfil=os.environ.get('MOBIKE_PERFIL_MODO') or None)
+
+
+# ============================================================================ #
+# COLETORES (destino dos registros)
+# ============================================================================ #
+
+class ColetorJsonl:
+    """Acrescenta um registro JSON por linha."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def registrar(self, registro):
+        linha = json.dumps(registro, ensure_ascii=False) + '\n'
+        with self._lock, open(self.caminho, 'a', encoding='utf-8') as f:
+            f.write(linha)
+
+    def fechar(self):
+        pass
+
+
+class ColetorPrometheus:
+    """
+    Acumula contadores por (estágio, modelo) e reescreve o arquivo no formato
+    texto do Prometheus (para o textfile collector do node_exporter).
+    """
+
+    def __init__(self, caminho, intervalo_s=INTERVALO_PROMETHEUS_S):
+        self.caminho = caminho
+        self.intervalo_s = intervalo_s
+        self._lock = threading.Lock()
+        self._totais = defaultdict(Counter)
+        self._picos = defaultdict(float)
+        self._ultima_escrita = 0.0
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        atexit.register(self.fechar)
+
+    def registrar(self, registro):
+        rotulos = tuple(sorted((k, v) for k, v in registro.items()
+                               if isinstance(v, str) and k not in ('ts', 'erro')))
+        with self._lock:
+            totais = self._totais[rotulos]
+            totais['chamadas'] += 1
+            totais['erros'] += 'erro' in registro
+            totais['segundos'] += registro['duracao_s']
+            for campo, valor in registro.items():
+                if campo == 'linhas' or campo.startswith('bytes_'):
+                    totais[campo] += valor or 0
+            for campo in ('rss_max_mb', 'pico_memoria_mb'):
+                if registro.get(campo) is not None:
+                    chave = (rotulos, campo)
+                    self._picos[chave] = max(self._picos[chave], registro[campo])
+            if time.monotonic() - self._ultima_escrita >= self.intervalo_s:
+                self._escrever()
+
+    def _escrever(self):
+        linhas = []
+        metricas = sorted({campo for totais in self._totais.values() for campo in totais})
+        for campo in metricas:
+            nome = f"mobike_estagio_{campo}_total"
+            linhas.append(f"# TYPE {nome} counter")
+            for rotulos, totais in sorted(self._totais.items()):
+                linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {totais[campo]:g}")
+        for campo in ('rss_max_mb', 'pico_memoria_mb'):
+            nome = f"mobike_estagio_{campo}"
+            pares = sorted((r, v) for (r, c), v in self._picos.items() if c == campo)
+            if pares:
+                linhas.append(f"# TYPE {nome} gauge")
+                linhas.extend(f"{nome}{_formatar_rotulos(r)} {v:g}" for r, v in pares)
+        # Escrita atômica: o coletor nunca lê um arquivo pela metade
+        temporario = self.caminho + '.tmp'
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(linhas) + '\n')
+        os.replace(temporario, self.caminho)
+        self._ultima_escrita = time.monotonic()
+
+    def fechar(self):
+        with self._lock:
+            if self._totais:
+                self._escrever()
+
+
+def _formatar_rotulos(rotulos):
+    if not rotulos:
+        return ''
+    def escapar(valor):
+        return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escapar(v)}"' for k, v in rotulos) + '}'
+
+
+# ============================================================================ #
+# PERFILADORES (um estágio por vez)
+# ============================================================================ #
+
+class PerfilCProfile:
+    """cProfile acumulado entre chamadas do estágio, salvo em .pstats a cada chamada."""
+
+    extensao = '.pstats'
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._perfil = cProfile.Profile()
+
+    def iniciar(self):
+        self._perfil.enable()
+
+    def parar(self):
+        self._perfil.disable()
+        self._perfil.dump_stats(self.caminho)
+
+
+class PerfilAmostragem:
+    """
+    Amostra a pilha da thread que roda o estágio a cada `intervalo_s` e salva as
+    pilhas no formato "folded" (uma pilha por linha com a contagem), que
+    flamegraph.pl e speedscope leem direto. O custo no estágio é quase nulo.
+    """
+
+    extensao = '.folded'
+
+    def __init__(self, caminho, intervalo_s=INTERVALO_AMOSTRAGEM_S):
+        self.caminho = caminho
+        self.intervalo_s = intervalo_s
+        self.pilhas = Counter()
+        self._parar = None
+        self._thread = None
+
+    def iniciar(self):
+        alvo = threading.get_ident()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._amostrar, args=(alvo, self._parar), daemon=True)
+        self._thread.start()
+
+    def _amostrar(self, alvo, parar):
+        while not parar.wait(self.intervalo_s):
+            frame = sys._current_frames().get(alvo)
+            pilha = []
+            while frame is not None:
+                codigo = frame.f_code
+                pilha.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+                frame = frame.f_back
+            if pilha:
+                self.pilhas[';'.join(reversed(pilha))] += 1
+
+    def parar(self):
+        self._parar.set()
+        self._thread.join()
+        with open(self.caminho, 'w', encoding='utf-8') as f:
+            for pilha, n in self.pilhas.most_common():
+                f.write(f"{pilha} {n}\n")
+
+
+_perfiladores = {}
+_lock_perfil = threading.Lock()
+
+
+def _perfilador(estagio):
+    """Perfilador do estágio (criado na primeira chamada; um arquivo por execução)."""
+    perfilador = _perfiladores.get(estagio)
+    if perfilador is None:
+        classe = PerfilAmostragem if _config.modo_perfil == 'amostragem' else PerfilCProfile
+        os.makedirs(_config.diretorio_perfis, exist_ok=True)
+        nome = f"{estagio}_{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}{classe.extensao}"
+        perfilador = _perfiladores[estagio] = classe(os.path.join(_config.diretorio_perfis, nome))
+        print(f"Perfilando '{estagio}' ({_config.modo_perfil}) em {perfilador.caminho}")
+    return perfilador
+
+
+# ============================================================================ #
+# INSTRUMENTAÇÃO
+# ============================================================================ #
+
+def _pilha_estagios():
+    pilha = getattr(_local, 'pilha', None)
+    if pilha is None:
+        pilha = _local.pilha = []
+    return pilha
+
+
+def anotar(**campos):
+    """Acrescenta campos (ex.: bytes_baixados=...) ao registro do estágio em andamento."""
+    pilha = _pilha_estagios()
+    if pilha:
+        pilha[-1][1].update(campos)
+
+
+def _rss_max_mb():
+    if resource is None:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS em bytes
+    return maximo / 2 ** 20 if sys.platform == 'darwin' else maximo / 2 ** 10
+
+
+def _contar_linhas(resultado):
+    if resultado is None or isinstance(resultado, (dict, str)):
+        return None
+    try:
+        return len(resultado)
+    except TypeError:
+        return None
+
+
+def instrumentado(estagio, linhas=None, rotulos=None):
+    """
+    Decora um estágio do pipeline. `linhas(resultado, *args, **kwargs)` conta
+    as linhas processadas (padrão: len do resultado); `rotulos(*args, **kwargs)`
+    devolve rótulos extras do registro (ex.: {'modelo': 'arvore'}). Chamadas
+    aninhadas do mesmo estágio (recursão) contam só na mais externa.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            perfilar = _config.perfil == estagio
+            pilha = _pilha_estagios()
+            if (_coletor is None and not perfilar) or any(nome == estagio for nome, _ in pilha):
+                return funcao(*args, **kwargs)
+
+            registro = {'estagio': estagio, **(rotulos(*args, **kwargs) if rotulos else {})}
+            pilha.append((estagio, registro))
+            # tracemalloc é global: só mede quem o ligou (estágios concorrentes ficam sem pico)
+            medir_memoria = _config.memoria and not tracemalloc.is_tracing()
+            perfilador = None
+            if perfilar and _lock_perfil.acquire(blocking=False):
+                perfilador = _perfilador(estagio)
+            if medir_memoria:
+                tracemalloc.start()
+            if perfilador is not None:
+                perfilador.iniciar()
+            inicio = time.perf_counter()
+            resultado = None
+            try:
+                resultado = funcao(*args, **kwargs)
+                return resultado
+            except BaseException as erro:
+                registro['erro'] = type(erro).__name__
+                raise
+            finally:
+                registro['duracao_s'] = time.perf_counter() - inicio
+                if perfilador is not None:
+                    perfilador.parar()
+                    _lock_perfil.release()
+                if medir_memoria:
+                    registro['pico_memoria_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+                    tracemalloc.stop()
+                pilha.pop()
+                if _coletor is not None:
+                    if 'erro' not in registro:
+                        registro['linhas'] = (linhas(resultado, *args, **kwargs) if linhas
+                                              else _contar_linhas(resultado))
+                    registro['rss_max_mb'] = _rss_max_mb()
+                    registro['ts'] = datetime.now().isoformat(timespec='milliseconds')
+                    _coletor.registrar(registro)
+        return envoltorio
+    return decorador
+
+
+# ============================================================================ #
+# RESUMO DE UM ARQUIVO .jsonl
+# ============================================================================ #
+
+def resumir(caminho):
+    """Por estágio (e modelo): chamadas, tempo total, p50/p99, linhas/s e bytes."""
+    import pandas as pd
+
+    registros = pd.read_json(caminho, lines=True)
+    chaves = ['estagio'] + (['modelo'] if 'modelo' in registros else [])
+    registros[chaves] = registros[chaves].fillna('')
+    agrupado = registros.groupby(chaves)
+    resumo = pd.DataFrame({
+        'chamadas': agrupado.size(),
+        'total_s': agrupado['duracao_s'].sum(),
+        'p50_ms': agrupado['duracao_s'].quantile(0.5) * 1000,
+        'p99_ms': agrupado['duracao_s'].quantile(0.99) * 1000,
+    })
+    if 'linhas' in registros:
+        resumo['linhas_por_s'] = agrupado['linhas'].sum() / resumo['total_s']
+    for coluna in [c for c in registros.columns if c.startswith('bytes_')]:
+        resumo[coluna] = agrupado[coluna].sum(min_count=1)
+    if 'pico_memoria_mb' in registros:
+        resumo['pico_memoria_mb'] = agrupado['pico_memoria_mb'].max()
+    return resumo.sort_values('total_s', ascending=False)
+
+
+_configurar_do_ambiente()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Resumo por estágio de um arquivo de métricas .jsonl.")
+    parser.add_argument('arquivo', help="arquivo gravado com MOBIKE_METRICAS=<arquivo>.jsonl")
+    args = parser.parse_args()
+    print(resumir(args.arquivo).to_string(float_format=lambda v: f"{v:,.3f}"))
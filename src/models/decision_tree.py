@@ -6,7 +6,16 @@ import math
 from collections import Counter
 import pandas as pd
 import numpy as np
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+
+try:
+    from src.instrumentation import instrumentado
+except ModuleNotFoundError as erro:
+    # Executado como script (python src/models/decision_tree.py): sem `src` no caminho, roda sem métricas
+    if erro.name != 'src':
+        raise
+
+    def instrumentado(estagio, linhas=None, rotulos=None):
+        return lambda funcao: funcao
 
 # ============================================================================ #
 # FUNÇÕES PARA CALCULAR ENTROPIA E GANHO DE INFORMAÇÃO
@@ -78,6 +87,7 @@ class NoArvore:
     def eh_folha(self):
         return self.classe_predita is not None
 
+@instrumentado('construir_arvore', linhas=lambda _, X, y, *a, **k: len(y))
 def construir_arvore_decisao(X, y, profundidade=0, prof_max=5, min_amostras_folha=2, verbose=False):
     n = len(y)
     y_array = y.to_numpy() if isinstance(y, pd.Series) else np.asarray(y)
@@ -134,8 +144,31 @@ def prever_uma_amostra(no, amostra):
     else:
         return prever_uma_amostra(no.direita, amostra)
 
+@instrumentado('prever_arvore')
 def prever(arvore, X):
-    return np.array([prever_uma_amostra(arvore, linha) for _, linha in X.iterrows()])
+    """
+    Previsão vetorizada: desce a árvore uma vez por nó, separando os índices
+    das amostras com máscaras booleanas (mesmo resultado de prever_uma_amostra).
+    """
+    colunas = {c: X[c].to_numpy() for c in X.columns}
+    folhas = []
+    pilha = [(arvore, np.arange(len(X)))]
+    while pilha:
+        no, indices = pilha.pop()
+        if len(indices) == 0:
+            continue
+        if no.eh_folha():
+            folhas.append((indices, no.classe_predita))
+            continue
+        mascara_esq = colunas[no.coluna][indices] <= no.limite
+        pilha.append((no.esquerda, indices[mascara_esq]))
+        pilha.append((no.direita, indices[~mascara_esq]))
+    if not folhas:
+        return np.array([])
+    saida = np.empty(len(X), dtype=np.result_type(*[np.asarray(c) for _, c in folhas]))
+    for indices, classe in folhas:
+        saida[indices] = classe
+    return saida
 
 def carregar_dados(caminho='data/raw/ciclovias.csv'):
     return pd.read_csv(caminho)
@@ -178,6 +211,8 @@ def dividir_estratificado(X, y, proporcao_teste=0.2, seed=42):
     return X_train, X_test, y_train, y_test
 
 def avaliar_modelo(y_real, y_pred, modelo_nome="Árvore de Decisão"):
+    # Importado aqui: carregar a árvore salva (ex.: mobike.py score) não precisa do scikit-learn
+    from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
     acc = accuracy_score(y_real, y_pred)
     print(f"\n{'='*70}")
     print(f"AVALIAÇÃO: {modelo_nome}")
@@ -8,6 +8,16 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, roc_auc_score
 
+try:
+    from src.instrumentation import instrumentado
+except ModuleNotFoundError as erro:
+    # Executado como script (python src/models/logistic_regression.py): sem `src` no caminho, roda sem métricas
+    if erro.name != 'src':
+        raise
+
+    def instrumentado(estagio, linhas=None, rotulos=None):
+        return lambda funcao: funcao
+
 # -------------------------
 # Carregamento e preparação
 # -------------------------
@@ -56,6 +66,7 @@ def treinar_regressao_logistica(X_train, y_train, seed=42, max_iter=1000, class_
 # -------------------------
 # Predição com limiar ajustável
 # -------------------------
+@instrumentado('prever_logistica')
 def prever_com_threshold(modelo, X, threshold=0.5):
     """
     Retorna um DataFrame com colunas:
@@ -9,8 +9,6 @@ import os
 from collections import Counter
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score
-import tensorflow as tf
-from tensorflow.keras import layers, models
 import warnings
 warnings.filterwarnings('ignore')
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
@@ -44,6 +42,22 @@ def preparar_features(df):
     y = df['rótulo'].map(mapa).fillna(0).astype(float)
     return X, y
 
+# ============================================================================ #
+# CONSTRUÇÃO DA REDE
+# ============================================================================ #
+
+def construir_modelo(n_features):
+    """Cria e compila a MLP 64 → 32 → 1 com saída sigmoid (0 a 1)."""
+    # Importado só aqui: carregar o TensorFlow leva segundos
+    from tensorflow.keras import layers, models
+    model = models.Sequential([
+        layers.Dense(64, activation='relu', input_shape=(n_features,)),
+        layers.Dense(32, activation='relu'),
+        layers.Dense(1, activation='sigmoid')  # saída entre 0 e 1
+    ])
+    model.compile(optimizer='adam', loss='mse', metrics=['mae'])
+    return model
+
 # ============================================================================ #
 # FUNÇÃO DE AVALIAÇÃO
 # ============================================================================ #
@@ -83,15 +97,8 @@ if __name__ == '__main__':
     X_train = scaler.fit_transform(X_train)
     X_test = scaler.transform(X_test)
 
-    # Construir modelo MLP
-    model = models.Sequential([
-        layers.Dense(64, activation='relu', input_shape=(X_train.shape[1],)),
-        layers.Dense(32, activation='relu'),
-        layers.Dense(1, activation='sigmoid')  # saída entre 0 e 1
-    ])
-
-    # Compilar modelo
-    model.compile(optimizer='adam', loss='mse', metrics=['mae'])
+    # Construir e compilar modelo MLP
+    model = construir_modelo(X_train.shape[1])
 
     # Treinar modelo
     history = model.fit(X_train, y_train, epochs=50, batch_size=16,
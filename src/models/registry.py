@@ -0,0 +1,177 @@
+"""
+Registro de modelos treinados: treina, salva e carrega a Árvore de Decisão,
+a Regressão Logística e a MLP com uma interface única de risco (0 a 1).
+
+Uso (a partir da raiz do projeto):
+    python -m src.models.registry                 # treina e salva os três
+    python -m src.models.registry arvore logistica
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import instrumentado
+from src.prepocessing.preprocess import FEATURES
+
+# --- CONFIGURAÇÕES ---
+DIRETORIO_MODELOS = os.path.join('data', 'models')
+CAMINHO_CSV = os.path.join('data', 'raw', 'ciclovias.csv')
+MODELOS = ('arvore', 'logistica', 'mlp')
+
+# Mesma escala da MLP: Baixo = 0.0, Médio = 0.5, Alto = 1.0
+RISCO_POR_CLASSE = np.array([0.0, 0.5, 1.0])
+
+
+def preparar_matriz(X):
+    """Garante um DataFrame numérico com as 6 features, na ordem do treino."""
+    if not isinstance(X, pd.DataFrame):
+        X = pd.DataFrame(np.asarray(X, dtype=float).reshape(-1, len(FEATURES)), columns=FEATURES)
+    X = X.copy()
+    for c in FEATURES:
+        if c not in X.columns:
+            X[c] = 0.0
+    return X[FEATURES].apply(pd.to_numeric, errors='coerce').fillna(0.0)
+
+
+class ModeloRisco:
+    """Modelo treinado + versão, com previsão de risco contínua entre 0 e 1."""
+
+    def __init__(self, nome, estimador, versao=None, scaler=None, treinado_em=None):
+        if nome not in MODELOS:
+            raise ValueError(f"Modelo desconhecido: {nome} (opções: {', '.join(MODELOS)})")
+        self.nome = nome
+        self.estimador = estimador
+        self.versao = versao
+        self.scaler = scaler
+        self.treinado_em = treinado_em
+
+    @instrumentado('prever_risco', rotulos=lambda self, X: {'modelo': self.nome})
+    def prever_risco(self, X):
+        X = preparar_matriz(X)
+        if len(X) == 0:
+            return np.empty(0)
+        if self.nome == 'arvore':
+            from src.models.decision_tree import prever
+            classes = prever(self.estimador, X).astype(int)
+            return RISCO_POR_CLASSE[classes]
+        if self.nome == 'logistica':
+            return self.estimador.predict_proba(X)[:, 1]
+        X_norm = self.scaler.transform(X)
+        preds = self.estimador.predict(X_norm, verbose=0).flatten()
+        return np.clip(preds, 0, 1)
+
+    def __repr__(self):
+        return f"ModeloRisco(nome={self.nome!r}, versao={self.versao!r})"
+
+
+# ============================================================================ #
+# TREINAMENTO (mesmos parâmetros do __main__ de cada modelo)
+# ============================================================================ #
+
+def treinar_modelo(nome, caminho=CAMINHO_CSV, seed=42):
+    if nome == 'arvore':
+        from src.models import decision_tree as dt
+        X, y = dt.preparar_features(dt.carregar_dados(caminho))
+        X_train, _, y_train, _ = dt.dividir_estratificado(X, y, proporcao_teste=0.2, seed=seed)
+        arvore = dt.construir_arvore_decisao(X_train, y_train, prof_max=5, min_amostras_folha=2)
+        return ModeloRisco(nome, arvore)
+
+    if nome == 'logistica':
+        from src.models import logistic_regression as lr
+        X, y = lr.preparar_features(lr.carregar_dados(caminho))
+        X_train, _, y_train, _ = lr.dividir_estratificado(X, y, proporcao_teste=0.2, seed=seed)
+        pipe = lr.treinar_regressao_logistica(X_train, y_train, seed=seed, max_iter=2000)
+        return ModeloRisco(nome, pipe)
+
+    if nome == 'mlp':
+        from sklearn.model_selection import train_test_split
+        from sklearn.preprocessing import StandardScaler
+        from src.models import mlp
+        X, y = mlp.preparar_features(mlp.carregar_dados(caminho))
+        X_train, _, y_train, _ = train_test_split(X, y, test_size=0.2, random_state=seed)
+        scaler = StandardScaler()
+        X_train = scaler.fit_transform(X_train)
+        rede = mlp.construir_modelo(X_train.shape[1])
+        rede.fit(X_train, y_train, epochs=50, batch_size=16, validation_split=0.2, verbose=0)
+        return ModeloRisco(nome, rede, scaler=scaler)
+
+    raise ValueError(f"Modelo desconhecido: {nome} (opções: {', '.join(MODELOS)})")
+
+
+# ============================================================================ #
+# PERSISTÊNCIA
+# ============================================================================ #
+
+def _caminhos(nome, diretorio):
+    base = os.path.join(diretorio, nome)
+    return base + '.pkl', base + '.keras'
+
+
+def salvar_modelo(modelo, diretorio=DIRETORIO_MODELOS):
+    """
+    Salva o modelo em `diretorio/<nome>.pkl` (e `<nome>.keras` para a MLP).
+    A versão é o hash SHA-256 (12 primeiros dígitos) dos artefatos salvos.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    caminho_pkl, caminho_keras = _caminhos(modelo.nome, diretorio)
+    sha = hashlib.sha256()
+
+    if modelo.nome == 'mlp':
+        modelo.estimador.save(caminho_keras)
+        with open(caminho_keras, 'rb') as f:
+            sha.update(f.read())
+        conteudo = pickle.dumps({'scaler': modelo.scaler})
+    else:
+        conteudo = pickle.dumps({'estimador': modelo.estimador})
+    sha.update(conteudo)
+
+    modelo.versao = sha.hexdigest()[:12]
+    modelo.treinado_em = modelo.treinado_em or datetime.now().isoformat()
+    pacote = pickle.loads(conteudo)
+    pacote.update({'nome': modelo.nome, 'versao': modelo.versao, 'treinado_em': modelo.treinado_em})
+    with open(caminho_pkl, 'wb') as f:
+        pickle.dump(pacote, f)
+    print(f"Modelo '{modelo.nome}' salvo em {caminho_pkl} (versão {modelo.versao})")
+    return modelo.versao
+
+
+def carregar_modelo(nome, diretorio=DIRETORIO_MODELOS):
+    caminho_pkl, caminho_keras = _caminhos(nome, diretorio)
+    if not os.path.exists(caminho_pkl):
+        raise FileNotFoundError(
+            f"Modelo não encontrado: {caminho_pkl} (rode `python -m src.models.registry {nome}`)"
+        )
+    with open(caminho_pkl, 'rb') as f:
+        pacote = pickle.load(f)
+
+    estimador = pacote.get('estimador')
+    if nome == 'mlp':
+        from tensorflow.keras import models
+        estimador = models.load_model(caminho_keras)
+    return ModeloRisco(nome, estimador, versao=pacote['versao'],
+                       scaler=pacote.get('scaler'), treinado_em=pacote.get('treinado_em'))
+
+
+def criar_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Treina e salva os modelos de risco.")
+    parser.add_argument('modelos', nargs='*', help=f"padrão: {' '.join(MODELOS)}")
+    parser.add_argument('--dados', default=CAMINHO_CSV, help="CSV rotulado")
+    parser.add_argument('--saida', default=DIRETORIO_MODELOS, help="diretório dos modelos")
+    return parser
+
+
+def main(argv=None, prog=None):
+    args = criar_parser(prog).parse_args(argv)
+    for nome in args.modelos or MODELOS:
+        print(f"Treinando '{nome}'...")
+        salvar_modelo(treinar_modelo(nome, args.dados), args.saida)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+"""
+Executor do pipeline coleta → pré-processamento → treino → materialização.
+
+Cada estágio declara entradas e saídas (arquivos ou padrões glob, incluindo o
+código do próprio estágio). A impressão digital de um estágio é o SHA-256 do
+conteúdo das entradas e dos parâmetros: se ela não mudou e as saídas continuam
+iguais às da última execução bem-sucedida, o estágio é pulado. Estágios
+independentes (os três treinos) rodam em paralelo, em processos separados.
+Cada execução grava um manifesto em `data/pipeline/execucoes/` com o que rodou,
+o que foi pulado e por quê, tempos e os hashes de entradas e saídas.
+
+Uso (a partir da raiz do projeto):
+    python -m src.pipeline                          # tudo o que estiver desatualizado
+    python -m src.pipeline materializacao           # um estágio e suas dependências
+    python -m src.pipeline --forcar coleta --paralelo 2
+    python -m src.pipeline --listar
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+
+# --- CONFIGURAÇÕES ---
+DIRETORIO_PIPELINE = os.path.join('data', 'pipeline')
+CAMINHO_PREVISOES = os.path.join('data', 'processed', 'previsoes.csv')
+CAMINHO_CICLOVIAS = os.path.join('data', 'raw', 'ciclovias.csv')
+RAW_PREVISOES = os.path.join('data', 'raw', 'location_*_raw.json')
+VALIDADE_COLETA_S = 3600  # a previsão da API muda com o tempo, não com as entradas
+BLOCO_HASH = 1 << 20
+
+
+# ============================================================================ #
+# FUNÇÕES DOS ESTÁGIOS (rodam em outro processo; importam só o que usam)
+# ============================================================================ #
+
+def coletar():
+    from src.prepocessing.fetch_weather_data import OpenMeteoFetcher, configurar_log
+    configurar_log()
+    fetcher = OpenMeteoFetcher()
+    # Os location_*_raw.json antigos continuam no disco: sem isso, uma coleta
+    # sem rede passaria por sucesso e renovaria a validade da última
+    if fetcher.collect_all() == 0:
+        raise RuntimeError(f"Nenhuma das {len(fetcher.locations)} estações foi coletada")
+
+
+def preprocessar(saida=CAMINHO_PREVISOES):
+    from src.prepocessing.preprocess import carregar_previsoes, save_data
+    save_data(carregar_previsoes(), saida)
+
+
+def treinar(nome):
+    from src.models.registry import salvar_modelo, treinar_modelo
+    salvar_modelo(treinar_modelo(nome))
+
+
+def materializar(previsoes=CAMINHO_PREVISOES):
+    import pandas as pd
+    from src.scoring.materialize import materializar as materializar_tabela
+    materializar_tabela('arvore', previsoes=pd.read_csv(previsoes))
+
+
+# ============================================================================ #
+# DECLARAÇÃO DOS ESTÁGIOS
+# ============================================================================ #
+
+class Estagio:
+    """Um passo do pipeline: função, entradas, saídas e estágios dos quais depende."""
+
+    def __init__(self, nome, funcao, entradas, saidas, depende_de=(), parametros=None, validade_s=None):
+        """
+        `entradas`/`saidas`: caminhos ou padrões glob. `validade_s`: idade
+        máxima da última execução (para estágios cujo resultado depende do
+        relógio, como a coleta da previsão).
+        """
+        self.nome = nome
+        self.funcao = funcao
+        self.entradas = list(entradas)
+        self.saidas = list(saidas)
+        self.depende_de = list(depende_de)
+        self.parametros = parametros or {}
+        self.validade_s = validade_s
+
+    def impressao(self, hashes_entradas):
+        conteudo = json.dumps({'estagio': self.nome, 'parametros': self.parametros,
+                               'entradas': hashes_entradas}, sort_keys=True)
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    def __repr__(self):
+        return f"Estagio({self.nome!r}, depende_de={self.depende_de!r})"
+
+
+def _estagio_treino(nome, codigo):
+    saidas = [os.path.join('data', 'models', f'{nome}.pkl')]
+    if nome == 'mlp':
+        saidas.append(os.path.join('data', 'models', 'mlp.keras'))
+    return Estagio(f'treino_{nome}', treinar, parametros={'nome': nome},
+                   # preprocess.py define a lista de FEATURES usada no treino
+                   entradas=[CAMINHO_CICLOVIAS, 'src/models/registry.py', 'src/prepocessing/preprocess.py', codigo],
+                   saidas=saidas)
+
+
+ESTAGIOS = [
+    Estagio('coleta', coletar,
+            entradas=['src/prepocessing/config_stations.json', 'src/prepocessing/fetch_weather_data.py'],
+            saidas=[RAW_PREVISOES], validade_s=VALIDADE_COLETA_S),
+    Estagio('preprocessamento', preprocessar, depende_de=['coleta'],
+            entradas=[RAW_PREVISOES, 'src/prepocessing/preprocess.py'],
+            saidas=[CAMINHO_PREVISOES]),
+    # Os modelos treinam com ciclovias.csv, não com as previsões: não dependem da coleta
+    _estagio_treino('arvore', 'src/models/decision_tree.py'),
+    _estagio_treino('logistica', 'src/models/logistic_regression.py'),
+    _estagio_treino('mlp', 'src/models/mlp.py'),
+    Estagio('materializacao', materializar, depende_de=['preprocessamento', 'treino_arvore'],
+            # Inclui o código que pontua e grava: registry/decision_tree (prever_risco) e tabela
+            entradas=[CAMINHO_PREVISOES, CAMINHO_CICLOVIAS, os.path.join('data', 'models', 'arvore.pkl'),
+                      'src/scoring/materialize.py', 'src/scoring/tabela.py', 'src/scoring/cache.py',
+                      'src/models/registry.py', 'src/models/decision_tree.py',
+                      'src/prepocessing/spatial_index.py'],
+            saidas=[os.path.join('data', 'processed', 'risco_ciclovias.sqlite')]),
+]
+
+
+# ============================================================================ #
+# HASHES DE CONTEÚDO
+# ============================================================================ #
+
+class HashesArquivos:
+    """
+    SHA-256 do conteúdo de arquivos, memorizado por (tamanho, mtime): um
+    arquivo só é relido quando um dos dois muda.
+    """
+
+    def __init__(self, memoria=None):
+        self.memoria = dict(memoria or {})
+
+    def hash(self, caminho):
+        info = os.stat(caminho)
+        anterior = self.memoria.get(caminho)
+        if anterior and anterior[0] == info.st_size and anterior[1] == info.st_mtime_ns:
+            return anterior[2]
+        sha = hashlib.sha256()
+        with open(caminho, 'rb') as f:
+            for bloco in iter(lambda: f.read(BLOCO_HASH), b''):
+                sha.update(bloco)
+        self.memoria[caminho] = [info.st_size, info.st_mtime_ns, sha.hexdigest()]
+        return sha.hexdigest()
+
+    def dos_padroes(self, padroes):
+        """Caminho → hash de todos os arquivos que casam com os padrões (ausentes ficam de fora)."""
+        caminhos = sorted({c for p in padroes for c in glob.glob(p) if os.path.isfile(c)})
+        return {c: self.hash(c) for c in caminhos}
+
+
+# ============================================================================ #
+# EXECUÇÃO
+# ============================================================================ #
+
+def carregar_estado(diretorio=DIRETORIO_PIPELINE):
+    caminho = os.path.join(diretorio, 'estado.json')
+    if not os.path.exists(caminho):
+        return {'arquivos': {}, 'estagios': {}}
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _salvar_json(dados, caminho):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, indent=2, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def _commit_git():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def com_dependencias(nomes, estagios=ESTAGIOS):
+    """Os estágios pedidos mais tudo de que dependem, na ordem de declaração."""
+    por_nome = {e.nome: e for e in estagios}
+    desconhecidos = [n for n in nomes if n not in por_nome]
+    if desconhecidos:
+        raise ValueError(f"Estágio desconhecido: {', '.join(desconhecidos)} (opções: {', '.join(por_nome)})")
+    selecionados = set()
+    pilha = list(nomes)
+    while pilha:
+        nome = pilha.pop()
+        if nome not in selecionados:
+            selecionados.add(nome)
+            pilha.extend(por_nome[nome].depende_de)
+    return [e for e in estagios if e.nome in selecionados]
+
+
+def motivo_execucao(estagio, impressao, entradas, anterior, hashes, forcar=()):
+    """Por que o estágio precisa rodar, ou None se pode ser pulado."""
+    if estagio.nome in forcar:
+        return 'forçado'
+    if not anterior:
+        return 'primeira execução'
+    if impressao != anterior['impressao']:
+        antes = anterior.get('entradas', {})
+        mudaram = sorted(c for c in set(entradas) | set(antes) if entradas.get(c) != antes.get(c))
+        return 'entradas mudaram: ' + ', '.join(mudaram) if mudaram else 'parâmetros mudaram'
+    if hashes.dos_padroes(estagio.saidas) != anterior.get('saidas'):
+        return 'saídas ausentes ou alteradas'
+    if estagio.validade_s is not None:
+        idade = time.time() - datetime.fromisoformat(anterior['executado_em']).timestamp()
+        if idade > estagio.validade_s:
+            return f'última execução há {idade / 60:.0f} min (validade {estagio.validade_s / 60:.0f} min)'
+    return None
+
+
+def _rodar(funcao, parametros):
+    inicio = time.perf_counter()
+    funcao(**parametros)
+    return time.perf_counter() - inicio
+
+
+class _ExecutorSerial:
+    """Mesma interface do ProcessPoolExecutor, rodando no próprio processo (paralelo=1)."""
+
+    def submit(self, funcao, *args):
+        futuro = Future()
+        try:
+            futuro.set_result(funcao(*args))
+        except Exception as erro:
+            futuro.set_exception(erro)
+        return futuro
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def executar(nomes=None, forcar=(), paralelo=None, estagios=ESTAGIOS, diretorio=DIRETORIO_PIPELINE):
+    """
+    Roda os estágios pedidos (padrão: todos) e suas dependências, pulando os
+    que estão em dia. Retorna o manifesto da execução.
+    """
+    selecionados = com_dependencias(nomes or [e.nome for e in estagios], estagios)
+    paralelo = paralelo or min(3, os.cpu_count() or 1)
+    estado = carregar_estado(diretorio)
+    hashes = HashesArquivos(estado.get('arquivos'))
+    manifesto = {'inicio': datetime.now().isoformat(), 'git': _commit_git(),
+                 'paralelo': paralelo, 'estagios': {}}
+    caminho_manifesto = os.path.join(diretorio, 'execucoes', f"execucao_{datetime.now():%Y%m%d_%H%M%S}.json")
+    inicio = time.perf_counter()
+
+    def concluir(estagio, registro):
+        manifesto['estagios'][estagio.nome] = registro
+        detalhe = registro.get('erro') or registro.get('motivo') or ''
+        duracao = f" em {registro['duracao_s']:.1f} s" if 'duracao_s' in registro else ''
+        print(f"[{estagio.nome}] {registro['status']}{duracao}" + (f" ({detalhe})" if detalhe else ''))
+
+    # Estágios com dependências pesadas rodam em processos novos (spawn), sem herdar o TensorFlow
+    executor = (ProcessPoolExecutor(paralelo, mp_context=multiprocessing.get_context('spawn'))
+                if paralelo > 1 else _ExecutorSerial())
+    pendentes = list(selecionados)
+    em_andamento = {}
+    try:
+        while pendentes or em_andamento:
+            for estagio in list(pendentes):
+                status_deps = [manifesto['estagios'].get(d, {}).get('status') for d in estagio.depende_de]
+                if None in status_deps:
+                    continue
+                pendentes.remove(estagio)
+                if any(s in ('erro', 'cancelado') for s in status_deps):
+                    concluir(estagio, {'status': 'cancelado', 'motivo': 'dependência falhou'})
+                    continue
+                entradas = hashes.dos_padroes(estagio.entradas)
+                impressao = estagio.impressao(entradas)
+                anterior = estado['estagios'].get(estagio.nome)
+                motivo = motivo_execucao(estagio, impressao, entradas, anterior, hashes, forcar)
+                if motivo is None:
+                    concluir(estagio, {'status': 'pulado', 'impressao': impressao,
+                                       'entradas': entradas, 'saidas': anterior['saidas']})
+                    continue
+                print(f"[{estagio.nome}] executando ({motivo})")
+                futuro = executor.submit(_rodar, estagio.funcao, estagio.parametros)
+                em_andamento[futuro] = (estagio, impressao, entradas, motivo)
+
+            if not em_andamento:
+                if pendentes:
+                    raise RuntimeError(f"Dependências circulares: {[e.nome for e in pendentes]}")
+                break
+            prontos, _ = wait(em_andamento, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                estagio, impressao, entradas, motivo = em_andamento.pop(futuro)
+                registro = {'motivo': motivo, 'impressao': impressao, 'entradas': entradas}
+                erro = futuro.exception()
+                saidas = hashes.dos_padroes(estagio.saidas) if erro is None else {}
+                if erro is None and not saidas:
+                    erro = RuntimeError(f"nenhuma saída gerada ({', '.join(estagio.saidas)})")
+                if erro is not None:
+                    concluir(estagio, {**registro, 'status': 'erro', 'erro': f"{type(erro).__name__}: {erro}"})
+                    continue
+                concluir(estagio, {**registro, 'status': 'executado', 'duracao_s': futuro.result(),
+                                   'saidas': saidas})
+                estado['estagios'][estagio.nome] = {
+                    'impressao': impressao, 'entradas': entradas, 'saidas': saidas,
+                    'executado_em': datetime.now().isoformat(),
+                }
+                estado['arquivos'] = hashes.memoria
+                _salvar_json(estado, os.path.join(diretorio, 'estado.json'))
+    finally:
+        executor.shutdown(wait=True)
+
+    manifesto['fim'] = datetime.now().isoformat()
+    manifesto['duracao_s'] = time.perf_counter() - inicio
+    estado['arquivos'] = hashes.memoria
+    _salvar_json(estado, os.path.join(diretorio, 'estado.json'))
+    _salvar_json(manifesto, caminho_manifesto)
+    print(f"Manifesto salvo em {caminho_manifesto}")
+    return manifesto
+
+
+def criar_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Roda o pipeline, pulando estágios cujas entradas não mudaram.")
+    parser.add_argument('estagios', nargs='*', help=f"padrão: todos ({' '.join(e.nome for e in ESTAGIOS)})")
+    parser.add_argument('--forcar', nargs='+', default=[], metavar='ESTAGIO',
+                        help="roda estes estágios mesmo se estiverem em dia")
+    parser.add_argument('--paralelo', type=int, default=None,
+                        help="processos para estágios independentes (padrão: até 3; 1 = sem processos)")
+    parser.add_argument('--listar', action='store_true', help="mostra os estágios e se estão em dia")
+    return parser
+
+
+def main(argv=None, prog=None):
+    args = criar_parser(prog).parse_args(argv)
+    if args.listar:
+        estado = carregar_estado()
+        hashes = HashesArquivos(estado.get('arquivos'))
+        for estagio in ESTAGIOS:
+            entradas = hashes.dos_padroes(estagio.entradas)
+            motivo = motivo_execucao(estagio, estagio.impressao(entradas), entradas,
+                                     estado['estagios'].get(estagio.nome), hashes)
+            deps = f" ← {', '.join(estagio.depende_de)}" if estagio.depende_de else ''
+            print(f"{estagio.nome:<17} {'em dia' if motivo is None else motivo}{deps}")
+    else:
+        manifesto = executar(args.estagios, args.forcar, args.paralelo)
+        if any(r['status'] in ('erro', 'cancelado') for r in manifesto['estagios'].values()):
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,4 @@
+import argparse
 import requests
 import json
 import csv
@@ -6,17 +7,37 @@ from datetime import datetime, timedelta
 from pathlib import Path
 import logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('data/raw/collection_log.txt'),
-        logging.StreamHandler()
-    ]
-)
+try:
+    from src.instrumentation import anotar, instrumentado
+except ModuleNotFoundError as erro:
+    # Executado como script (python src/prepocessing/fetch_weather_data.py): sem `src` no caminho, roda sem métricas
+    if erro.name != 'src':
+        raise
+
+    def instrumentado(estagio, linhas=None, rotulos=None):
+        return lambda funcao: funcao
+
+    def anotar(**campos):
+        pass
+
+CAMINHO_LOG = 'data/raw/collection_log.txt'
+
 logger = logging.getLogger(__name__)
 
 
+def configurar_log(caminho=CAMINHO_LOG):
+    """Log da coleta no console e em `caminho` (chamado por quem executa a coleta, não no import)."""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(caminho),
+            logging.StreamHandler()
+        ]
+    )
+
+
 class OpenMeteoFetcher:
     """Classe para coletar dados da API Open-Meteo."""
     
@@ -50,6 +71,9 @@ class OpenMeteoFetcher:
             return False
         return True
     
+    @instrumentado('fetch_station_data',
+                   linhas=lambda dados, *_: len(dados['hourly']['time']) if dados else 0,
+                   rotulos=lambda self, location: {'location_id': location['id']})
     def fetch_station_data(self, location):
         if not self._validate_coordinates(location['latitude'], location['longitude']):
             logger.error(f"Coordenadas inválidas para {location['name']}")
@@ -66,6 +90,7 @@ class OpenMeteoFetcher:
             logger.info(f"Coletando dados de {location['name']}")
             response = requests.get(self.FORECAST_URL, params=params)
             response.raise_for_status()
+            anotar(bytes_baixados=len(response.content))
             
             data = response.json()
             
@@ -124,20 +149,34 @@ class OpenMeteoFetcher:
             logger.error(f"Erro ao salvar metadados: {str(e)}")
     
     def collect_all(self):
+        """Coleta todas as estações e retorna quantas foram coletadas com sucesso."""
         logger.info("Iniciando coleta de previsão meteorológica")
         
+        coletadas = 0
         for location in self.locations:
             data = self.fetch_station_data(location)
             if data:
                 self.save_raw_data(data, location['id'])
+                coletadas += 1
         
         self.save_metadata()
-        logger.info("Coleta concluída")
+        logger.info(f"Coleta concluída: {coletadas}/{len(self.locations)} estações")
+        return coletadas
+
+
+def criar_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Coleta a previsão horária das estações (Open-Meteo).")
+    parser.add_argument('--config', default="src/prepocessing/config_stations.json")
+    return parser
+
+
+def main(argv=None, prog=None):
+    args = criar_parser(prog).parse_args(argv)
+    configurar_log()
+    # Coleta dados de previsão meteorológica; sai com erro se nenhuma estação respondeu
+    if OpenMeteoFetcher(args.config).collect_all() == 0:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
-    # Exemplo de uso
-    fetcher = OpenMeteoFetcher()
-    
-    # Coleta dados de previsão meteorológica
-    fetcher.collect_all()
+    main()
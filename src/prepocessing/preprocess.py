@@ -1,8 +1,23 @@
+import argparse
+import glob
 import pandas as pd
 import numpy as np
 import os
 import json
 
+try:
+    from src.instrumentation import anotar, instrumentado
+except ModuleNotFoundError as erro:
+    # Executado como script (python src/prepocessing/preprocess.py): sem `src` no caminho, roda sem métricas
+    if erro.name != 'src':
+        raise
+
+    def instrumentado(estagio, linhas=None, rotulos=None):
+        return lambda funcao: funcao
+
+    def anotar(**campos):
+        pass
+
 # --- CONFIGURAÇÕES ---
 # Ajuste estes nomes de colunas conforme o seu CSV original
 COL_TEMP = 'temperature_2m'         # Coluna de temperatura
@@ -11,11 +26,22 @@ COL_WIND = 'wind_speed_10m'         # Coluna de vento
 COL_RAIN = 'precipitation'          # Coluna de chuva
 COL_DATE = 'time'                   # Coluna de data/hora
 
+DIRETORIO_RAW = os.path.join('data', 'raw')
+CAMINHO_PREVISOES = os.path.join('data', 'processed', 'previsoes.csv')
+FORMATO_HORA = '%Y-%m-%dT%H:%M'
+# Features usadas pelos modelos (src/models/registry.py), na ordem das colunas
+FEATURES = [
+    'weather_code', 'wind_speed_10m', 'precipitation',
+    'sensacao_termica', 'chuva_acumulada_3h', 'rajada_maxima_3h'
+]
+
+@instrumentado('load_data')
 def load_data(filepath):
     """Carrega os dados brutos."""
     if not os.path.exists(filepath):
         raise FileNotFoundError(f"Arquivo não encontrado: {filepath}")
-    
+    anotar(bytes_lidos=os.path.getsize(filepath))
+
     # Verifica se é JSON ou CSV
     if filepath.endswith('.json'):
         with open(filepath, 'r') as f:
@@ -31,6 +57,7 @@ def load_data(filepath):
     print(f"Dados carregados: {df.shape}")
     return df
 
+@instrumentado('clean_data')
 def clean_data(df):
     """
     Tarefa 1: Limpeza dos dados
@@ -75,6 +102,7 @@ def calculate_heat_index(temp, humidity):
     # HI = T - 0.55 * (1 - 0.01 * RH) * (T - 14.5)
     return temp - 0.55 * (1 - 0.01 * humidity) * (temp - 14.5)
 
+@instrumentado('feature_engineering')
 def feature_engineering(df):
     """
     Tarefa 2: Criar variáveis derivadas
@@ -112,11 +140,52 @@ def save_data(df, output_path):
     df.to_csv(output_path, index=False)
     print(f"Dataset salvo com sucesso em: {output_path}")
 
-def main():
-    # Caminhos (ajuste o nome do arquivo de entrada conforme necessário)
+def carregar_previsoes(diretorio=DIRETORIO_RAW):
+    """
+    Lê todos os `location_*_raw.json` e aplica o pré-processamento acima a cada
+    um. Retorna uma linha por (location_id, hora) com as
+    coordenadas do ponto da grade e as 6 features dos modelos.
+    """
+    partes = []
+    for caminho in sorted(glob.glob(os.path.join(diretorio, 'location_*_raw.json'))):
+        with open(caminho, 'r', encoding='utf-8') as f:
+            bruto = json.load(f)
+        df = feature_engineering(clean_data(load_data(caminho)))
+        df['location_id'] = bruto.get('location_id') or os.path.basename(caminho).replace('_raw.json', '')
+        df['grade_lat'] = bruto['latitude']
+        df['grade_lon'] = bruto['longitude']
+        df['hora'] = df['time'].dt.strftime(FORMATO_HORA)
+        partes.append(df)
+    if not partes:
+        raise FileNotFoundError(f"Nenhum location_*_raw.json encontrado em {diretorio}")
+
+    previsoes = pd.concat(partes, ignore_index=True)
+    for c in FEATURES:
+        if c not in previsoes.columns:
+            previsoes[c] = 0.0
+    return previsoes[['location_id', 'grade_lat', 'grade_lon', 'hora'] + FEATURES]
+
+def criar_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Limpeza e engenharia de features das previsões coletadas.")
+    parser.add_argument('--entrada', default=os.path.join('data', 'raw', 'location_001_raw.json'),
+                        help="JSON ou CSV de uma estação")
+    parser.add_argument('--saida', help="CSV de saída (padrão: data/processed/weather_processed.csv; "
+                                        "com --todas, data/processed/previsoes.csv)")
+    parser.add_argument('--todas', action='store_true',
+                        help="todas as estações (location_*_raw.json) em uma tabela por location_id e hora, "
+                             "a entrada da tabela de risco")
+    return parser
+
+def main(argv=None, prog=None):
+    args = criar_parser(prog).parse_args(argv)
+    if args.todas:
+        save_data(carregar_previsoes(), args.saida or CAMINHO_PREVISOES)
+        return
+
+    # Caminhos (ajuste o nome do arquivo de entrada com --entrada)
     base_path = os.getcwd() # Ou defina o caminho absoluto da pasta Mobike
-    raw_path = os.path.join(base_path, 'data', 'raw', 'location_001_raw.json') 
-    processed_path = os.path.join(base_path, 'data', 'processed', 'weather_processed.csv')
+    raw_path = os.path.join(base_path, args.entrada)
+    processed_path = os.path.join(base_path, args.saida or os.path.join('data', 'processed', 'weather_processed.csv'))
 
     try:
         # Pipeline de execução
@@ -0,0 +1,205 @@
+"""
+Coordenadas das ciclovias e índice espacial dos pontos de previsão.
+
+- `parse_coordenadas`: converte a coluna COORDENADAS ("lat, lon" entre aspas)
+  em duas colunas float, de forma vetorizada.
+- `IndiceGrade`: vizinho mais próximo (distância haversine) entre os pontos
+  da grade meteorológica dos `location_*_raw.json` e milhares de ciclovias ou
+  qualquer coordenada GPS, de uma só vez. Grades pequenas (as estações de
+  `config_stations.json`) usam as distâncias diretas em NumPy; acima de
+  LIMITE_FORCA_BRUTA pontos, uma BallTree do scikit-learn. O índice é salvo
+  em disco e só é reconstruído quando os arquivos brutos mudam.
+
+Uso (a partir da raiz do projeto):
+    python -m src.prepocessing.spatial_index
+    python -m src.prepocessing.spatial_index --ponto -19.93 -43.93
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURAÇÕES ---
+DIRETORIO_RAW = os.path.join('data', 'raw')
+CAMINHO_INDICE = os.path.join('data', 'processed', 'indice_grade.pkl')
+RAIO_TERRA_KM = 6371.0088
+# Até quantos pontos de grade a distância a todos sai mais barata que a BallTree
+# (que custa ~1,5 s só para importar o scikit-learn)
+LIMITE_FORCA_BRUTA = 256
+FORMATO_INDICE = 2  # muda quando o que é salvo em disco muda
+BLOCO_CONSULTA = 8192  # consultas por bloco: limita a matriz consultas × pontos
+
+_PADRAO_COORDENADAS = r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$'
+
+
+def parse_coordenadas(coordenadas):
+    """
+    Converte uma Series de strings "lat, lon" em um DataFrame com as colunas
+    `latitude` e `longitude` (float). Valores vazios, mal formatados ou fora
+    dos limites (lat em [-90, 90], lon em [-180, 180]) viram NaN.
+    """
+    partes = coordenadas.astype('string').str.extract(_PADRAO_COORDENADAS)
+    resultado = pd.DataFrame({
+        'latitude': pd.to_numeric(partes[0], errors='coerce'),
+        'longitude': pd.to_numeric(partes[1], errors='coerce'),
+    }, index=coordenadas.index).astype(float)
+    validas = resultado['latitude'].between(-90, 90) & resultado['longitude'].between(-180, 180)
+    resultado[~validas] = np.nan
+    return resultado
+
+
+def adicionar_coordenadas(df, coluna='COORDENADAS'):
+    """Cópia de `df` com as colunas `latitude` e `longitude` extraídas de `coluna`."""
+    df = df.copy()
+    df[['latitude', 'longitude']] = parse_coordenadas(df[coluna])
+    return df
+
+
+# ============================================================================ #
+# ÍNDICE ESPACIAL DA GRADE METEOROLÓGICA
+# ============================================================================ #
+
+def _arquivos_raw(diretorio):
+    return sorted(glob.glob(os.path.join(diretorio, 'location_*_raw.json')))
+
+
+def assinatura_raw(diretorio=DIRETORIO_RAW):
+    """Hash de nome, tamanho e data de modificação dos `location_*_raw.json`."""
+    sha = hashlib.sha256()
+    for caminho in _arquivos_raw(diretorio):
+        info = os.stat(caminho)
+        sha.update(f"{os.path.basename(caminho)}|{info.st_size}|{info.st_mtime_ns}".encode())
+    return sha.hexdigest()
+
+
+def carregar_pontos_grade(diretorio=DIRETORIO_RAW):
+    """Um ponto (location_id, latitude, longitude) por arquivo bruto, com as coordenadas da grade."""
+    pontos = []
+    for caminho in _arquivos_raw(diretorio):
+        with open(caminho, 'r', encoding='utf-8') as f:
+            bruto = json.load(f)
+        pontos.append({
+            'location_id': bruto.get('location_id') or os.path.basename(caminho).replace('_raw.json', ''),
+            'latitude': bruto['latitude'],
+            'longitude': bruto['longitude'],
+        })
+    if not pontos:
+        raise FileNotFoundError(f"Nenhum location_*_raw.json encontrado em {diretorio}")
+    return pd.DataFrame(pontos)
+
+
+class IndiceGrade:
+    """Vizinho mais próximo (distância haversine) entre coordenadas e pontos da grade."""
+
+    def __init__(self, pontos, assinatura=None):
+        self.pontos = pontos[['location_id', 'latitude', 'longitude']].reset_index(drop=True)
+        self.assinatura = assinatura
+        self.formato = FORMATO_INDICE
+        self._radianos = np.radians(self.pontos[['latitude', 'longitude']].to_numpy(dtype=float))
+        self._arvore = None
+        if len(self.pontos) > LIMITE_FORCA_BRUTA:
+            from sklearn.neighbors import BallTree
+            self._arvore = BallTree(self._radianos, metric='haversine')
+
+    @classmethod
+    def construir(cls, diretorio=DIRETORIO_RAW):
+        return cls(carregar_pontos_grade(diretorio), assinatura_raw(diretorio))
+
+    def mais_proximo(self, latitudes, longitudes):
+        """
+        Para cada coordenada, retorna (location_id, distância em km). Aceita
+        escalares ou arrays; coordenadas NaN retornam location_id None e distância NaN.
+        """
+        lat = np.atleast_1d(np.asarray(latitudes, dtype=float))
+        lon = np.atleast_1d(np.asarray(longitudes, dtype=float))
+        validas = ~(np.isnan(lat) | np.isnan(lon))
+
+        ids = np.full(len(lat), None, dtype=object)
+        distancias = np.full(len(lat), np.nan)
+        if validas.any():
+            consulta = np.radians(np.column_stack([lat[validas], lon[validas]]))
+            if self._arvore is not None:
+                dist, idx = self._arvore.query(consulta, k=1)
+                dist, idx = dist[:, 0], idx[:, 0]
+            else:
+                dist, idx = self._mais_proximo_direto(consulta)
+            ids[validas] = self.pontos['location_id'].to_numpy()[idx]
+            distancias[validas] = dist * RAIO_TERRA_KM
+        return ids, distancias
+
+    def _mais_proximo_direto(self, consulta):
+        """Distância angular (haversine) de cada consulta a todos os pontos, em blocos."""
+        dist = np.empty(len(consulta))
+        idx = np.empty(len(consulta), dtype=np.int64)
+        lat_p, lon_p = self._radianos[:, 0], self._radianos[:, 1]
+        for inicio in range(0, len(consulta), BLOCO_CONSULTA):
+            lat = consulta[inicio:inicio + BLOCO_CONSULTA, 0:1]
+            lon = consulta[inicio:inicio + BLOCO_CONSULTA, 1:2]
+            a = (np.sin((lat - lat_p) / 2) ** 2
+                 + np.cos(lat) * np.cos(lat_p) * np.sin((lon - lon_p) / 2) ** 2)
+            melhor = a.argmin(axis=1)
+            idx[inicio:inicio + len(lat)] = melhor
+            dist[inicio:inicio + len(lat)] = 2 * np.arcsin(np.sqrt(np.clip(a[np.arange(len(lat)), melhor], 0, 1)))
+        return dist, idx
+
+    def associar(self, df, lat='latitude', lon='longitude'):
+        """Cópia de `df` com `location_id` e `distancia_km` do ponto de grade mais próximo."""
+        ids, distancias = self.mais_proximo(df[lat].to_numpy(), df[lon].to_numpy())
+        df = df.copy()
+        df['location_id'] = ids
+        df['distancia_km'] = distancias
+        return df
+
+    def salvar(self, caminho=CAMINHO_INDICE):
+        if os.path.dirname(caminho):
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        with open(caminho, 'wb') as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def carregar(caminho=CAMINHO_INDICE):
+        with open(caminho, 'rb') as f:
+            return pickle.load(f)
+
+
+def carregar_ou_construir_indice(diretorio=DIRETORIO_RAW, caminho=CAMINHO_INDICE):
+    """Usa o índice salvo se os arquivos brutos não mudaram; senão reconstrói e salva."""
+    assinatura = assinatura_raw(diretorio)
+    if os.path.exists(caminho):
+        try:
+            indice = IndiceGrade.carregar(caminho)
+        except (AttributeError, ImportError, pickle.UnpicklingError, EOFError):
+            indice = None  # salvo por outra versão do código: reconstrói
+        if (indice is not None and getattr(indice, 'formato', None) == FORMATO_INDICE
+                and indice.assinatura == assinatura):
+            return indice
+    indice = IndiceGrade(carregar_pontos_grade(diretorio), assinatura)
+    indice.salvar(caminho)
+    print(f"Índice espacial salvo em {caminho} ({len(indice.pontos)} pontos de grade)")
+    return indice
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Índice espacial ciclovia → ponto de previsão.")
+    parser.add_argument('--ciclovias', default=os.path.join('data', 'raw', 'ciclovias.csv'))
+    parser.add_argument('--ponto', nargs=2, type=float, metavar=('LAT', 'LON'),
+                        help="consulta uma coordenada GPS em vez das ciclovias")
+    args = parser.parse_args()
+
+    # Pela importação do pacote: rodando com -m, a classe deste arquivo seria
+    # `__main__.IndiceGrade` e o índice salvo não abriria em outros módulos
+    from src.prepocessing.spatial_index import carregar_ou_construir_indice
+    indice = carregar_ou_construir_indice()
+    if args.ponto:
+        ids, dist = indice.mais_proximo(*args.ponto)
+        print(f"Ponto de previsão mais próximo: {ids[0]} ({dist[0]:.2f} km)")
+    else:
+        ciclovias = indice.associar(adicionar_coordenadas(pd.read_csv(args.ciclovias)))
+        print(ciclovias[['NOME_LOGRADOURO', 'latitude', 'longitude', 'location_id', 'distancia_km']]
+              .to_string(index=False))
@@ -0,0 +1,164 @@
+"""
+Cache de previsões por vetor de features.
+
+Várias ciclovias compartilham o mesmo ponto de previsão, então os vetores de
+6 features repetem muito. `CachePrevisoes` remove duplicatas do lote, consulta
+um LRU indexado por (modelo, versão, vetor) e só chama o modelo para os
+vetores ainda não vistos. Por padrão a chave é o vetor exato, e o resultado é
+idêntico ao do modelo sem cache; a quantização (vetores próximos compartilham
+a previsão) é opcional. `ModeloComCache` expõe a mesma interface de
+`ModeloRisco` (`nome`, `versao`, `prever_risco`) e pode substituí-lo em
+qualquer lugar.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.models.registry import FEATURES, preparar_matriz
+
+# --- CONFIGURAÇÕES ---
+CAPACIDADE_PADRAO = 100_000
+
+
+def _unicas_por_bytes(q):
+    """Primeira linha de cada vetor distinto (na ordem de 1ª aparição) e o código de cada linha."""
+    linhas = q.view(np.dtype((np.void, q.itemsize * q.shape[1]))).ravel()
+    _, primeiras, inverso = np.unique(linhas, return_index=True, return_inverse=True)
+    ordem = np.argsort(primeiras)
+    posicao = np.empty_like(ordem)
+    posicao[ordem] = np.arange(len(ordem))
+    return primeiras[ordem], posicao[inverso.ravel()]
+
+
+class CachePrevisoes:
+    """LRU de riscos previstos, compartilhável entre modelos, com métricas de acerto."""
+
+    def __init__(self, capacidade=CAPACIDADE_PADRAO, passos=None):
+        """
+        `passos`: None (padrão) usa o vetor exato como chave. Um dicionário
+        feature → passo, ou um único número para todas, liga a quantização:
+        vetores no mesmo passo compartilham a previsão, feita no centro do
+        passo, e o risco pode diferir do modelo sem cache. Features fora do
+        dicionário continuam exatas.
+        """
+        if isinstance(passos, (int, float)):
+            passos = {f: float(passos) for f in FEATURES}
+        desconhecidas = set(passos or {}) - set(FEATURES)
+        if desconhecidas:
+            raise ValueError(f"Features desconhecidas em passos: {', '.join(sorted(desconhecidas))}")
+        self.passos = {f: float(p) for f, p in (passos or {}).items() if p}
+        self.capacidade = capacidade
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.linhas = 0
+        self.linhas_unicas = 0
+        self.acertos = 0
+        self.faltas = 0
+        self.remocoes = 0
+
+    def __len__(self):
+        return len(self._itens)
+
+    def quantizar(self, X):
+        """Vetores usados como chave: exatos, ou no centro do passo das features quantizadas."""
+        X = preparar_matriz(X).to_numpy(dtype=float, copy=True)
+        for j, f in enumerate(FEATURES):
+            if f in self.passos:
+                X[:, j] = np.round(X[:, j] / self.passos[f]) * self.passos[f]
+        # + 0.0 troca -0.0 por 0.0, que teriam bytes diferentes na chave
+        return np.ascontiguousarray(X + 0.0)
+
+    def prever_risco(self, modelo, X):
+        """Risco de cada linha de X, chamando `modelo` só para os vetores que faltam no cache."""
+        q = self.quantizar(X)
+        if len(q) == 0:
+            return np.empty(0)
+        # Deduplicação em O(n): hash de cada linha + factorize (códigos na ordem de 1ª aparição)
+        hashes = pd.util.hash_pandas_object(pd.DataFrame(q), index=False).to_numpy()
+        inverso, _ = pd.factorize(hashes)
+        primeira_vez = np.ones(len(inverso), dtype=bool)
+        primeira_vez[1:] = inverso[1:] > np.maximum.accumulate(inverso)[:-1]
+        primeiras = np.flatnonzero(primeira_vez)
+        bits = q.view(np.uint64)
+        if not np.array_equal(bits, bits[primeiras][inverso]):
+            # Colisão de hash: linhas diferentes com o mesmo código ganhariam o
+            # mesmo risco. Refaz este lote comparando os bytes de cada linha
+            primeiras, inverso = _unicas_por_bytes(q)
+
+        prefixo = (modelo.nome, modelo.versao)
+        chaves = [prefixo + (q[i].tobytes(),) for i in primeiras]
+        riscos = np.empty(len(primeiras))
+        faltantes = []
+        with self._lock:
+            for i, chave in enumerate(chaves):
+                valor = self._itens.get(chave)
+                if valor is None:
+                    faltantes.append(i)
+                else:
+                    self._itens.move_to_end(chave)
+                    riscos[i] = valor
+
+        if faltantes:
+            # Prevê na própria chave: o vetor exato, ou o centro do passo quando
+            # quantizado, para o valor não depender de qual linha chegou primeiro
+            novos = np.asarray(modelo.prever_risco(q[primeiras[faltantes]]), dtype=float)
+            riscos[faltantes] = novos
+
+        with self._lock:
+            for i, valor in zip(faltantes, riscos[faltantes]):
+                self._itens[chaves[i]] = float(valor)
+            excesso = max(len(self._itens) - self.capacidade, 0)
+            for _ in range(excesso):
+                self._itens.popitem(last=False)
+            self.linhas += len(q)
+            self.linhas_unicas += len(primeiras)
+            self.faltas += len(faltantes)
+            self.acertos += len(primeiras) - len(faltantes)
+            self.remocoes += excesso
+
+        return riscos[inverso]
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def metricas(self):
+        with self._lock:
+            consultas = self.acertos + self.faltas
+            return {
+                'itens': len(self._itens),
+                'capacidade': self.capacidade,
+                'linhas': self.linhas,
+                'linhas_unicas': self.linhas_unicas,
+                'acertos': self.acertos,
+                'faltas': self.faltas,
+                'remocoes': self.remocoes,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+                # fração das linhas que não chegou ao modelo (duplicatas + acertos)
+                'taxa_economia': 1 - self.faltas / self.linhas if self.linhas else 0.0,
+            }
+
+
+class ModeloComCache:
+    """ModeloRisco com cache na frente; mesma interface do modelo original."""
+
+    def __init__(self, modelo, cache=None):
+        self.modelo = modelo
+        self.cache = cache if cache is not None else CachePrevisoes()
+
+    @property
+    def nome(self):
+        return self.modelo.nome
+
+    @property
+    def versao(self):
+        return self.modelo.versao
+
+    def prever_risco(self, X):
+        return self.cache.prever_risco(self.modelo, X)
+
+    def __repr__(self):
+        return f"ModeloComCache({self.modelo!r}, itens={len(self.cache)})"
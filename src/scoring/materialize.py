@@ -0,0 +1,130 @@
+"""
+Tabela materializada de risco por ciclovia e por hora.
+
+Cruza as previsões horárias de `data/raw/location_*_raw.json` com as ciclovias
+de `data/raw/ciclovias.csv` (cada ciclovia usa o ponto de previsão mais
+próximo), pontua tudo com um modelo salvo e grava o resultado em uma tabela
+SQLite indexada por (logradouro, hora). Cada ponto de grade também ganha
+linhas '@location_id', com ou sem ciclovia próxima, usadas pelas rotas com
+coordenadas GPS. Em cada atualização só são pontuadas as linhas cujo vetor de
+features mudou (ou cujo modelo mudou de versão).
+
+Uso (a partir da raiz do projeto):
+    python -m src.scoring.materialize --modelo arvore
+    python -m src.scoring.materialize --consultar "Av. Afonso Pena - Belo Horizonte" 18
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.models.registry import FEATURES, carregar_modelo
+from src.scoring.cache import ModeloComCache
+from src.prepocessing.preprocess import DIRETORIO_RAW, carregar_previsoes
+from src.prepocessing.spatial_index import IndiceGrade, adicionar_coordenadas, carregar_ou_construir_indice
+# criar_parser/main ficam em tabela.py, que não importa pandas (--help e consultas rápidas)
+from src.scoring.tabela import CAMINHO_TABELA, PREFIXO_PONTO_GRADE, TabelaRisco, criar_parser, main
+
+# --- CONFIGURAÇÕES ---
+CAMINHO_CICLOVIAS = os.path.join('data', 'raw', 'ciclovias.csv')
+# Casas decimais consideradas ao comparar features. As previsões têm no máximo
+# 6 casas (sensacao_termica = T - 0.0055·UR·(T - 14.5), com T em 2 casas), então
+# arredondar em 8 só descarta o ruído de float (ex.: CSV relido sem round_trip)
+# e nunca cai num empate .xxxxx5 que viraria para um lado ou outro
+CASAS_HASH = 8
+
+
+# ============================================================================ #
+# ENTRADAS: PREVISÕES E CICLOVIAS
+# ============================================================================ #
+
+def carregar_ciclovias(caminho=CAMINHO_CICLOVIAS):
+    """Nome e coordenadas das ciclovias; ignora linhas sem coordenada válida."""
+    df = adicionar_coordenadas(pd.read_csv(caminho))
+    validas = df['latitude'].notna() & df['longitude'].notna()
+    if (~validas).any():
+        print(f"Ignorando {(~validas).sum()} ciclovias sem coordenadas válidas.")
+    df = df[validas].drop_duplicates(subset='NOME_LOGRADOURO', keep='first')
+    return df[['NOME_LOGRADOURO', 'latitude', 'longitude']].reset_index(drop=True)
+
+
+def _mesmos_pontos(a, b):
+    colunas = ['location_id', 'latitude', 'longitude']
+    a, b = (p[colunas].sort_values('location_id').reset_index(drop=True) for p in (a, b))
+    return a.equals(b)
+
+
+def associar_ponto_mais_proximo(ciclovias, previsoes, indice=None):
+    """
+    Adiciona `location_id` do ponto de previsão mais próximo de cada ciclovia.
+    `indice`: o IndiceGrade salvo em disco (`carregar_ou_construir_indice`);
+    só é montado um índice em memória se ele não tiver os mesmos pontos de grade
+    que `previsoes` (ex.: previsões de outra coleta).
+    """
+    pontos = (previsoes[['location_id', 'grade_lat', 'grade_lon']]
+              .drop_duplicates('location_id')
+              .rename(columns={'grade_lat': 'latitude', 'grade_lon': 'longitude'}))
+    if indice is None or not _mesmos_pontos(indice.pontos, pontos):
+        indice = IndiceGrade(pontos)
+    return indice.associar(ciclovias)
+
+
+def hash_features(df):
+    """Hash (int64) do vetor de features de cada linha, arredondado a CASAS_HASH casas."""
+    valores = df[FEATURES].astype(float).round(CASAS_HASH)
+    return pd.util.hash_pandas_object(valores, index=False).to_numpy().view(np.int64)
+
+
+def montar_entradas(ciclovias, previsoes, indice=None):
+    """Produto ciclovia × hora com as features do ponto de previsão associado."""
+    ciclovias = associar_ponto_mais_proximo(ciclovias, previsoes, indice)
+    entradas = ciclovias[['NOME_LOGRADOURO', 'location_id']].merge(
+        previsoes[['location_id', 'hora'] + FEATURES], on='location_id'
+    )
+    entradas = entradas.rename(columns={'NOME_LOGRADOURO': 'logradouro'})
+    entradas['hash_entrada'] = hash_features(entradas)
+    return entradas.reset_index(drop=True)
+
+
+def entradas_pontos_grade(previsoes):
+    """Uma linha '@location_id' por ponto de grade e hora, no mesmo formato de `montar_entradas`."""
+    entradas = previsoes[['location_id', 'hora'] + FEATURES].copy()
+    entradas.insert(0, 'logradouro', PREFIXO_PONTO_GRADE + entradas['location_id'].astype(str))
+    entradas['hash_entrada'] = hash_features(entradas)
+    return entradas.reset_index(drop=True)
+
+
+def materializar(nome_modelo='arvore', caminho_tabela=CAMINHO_TABELA,
+                 diretorio_raw=DIRETORIO_RAW, caminho_ciclovias=CAMINHO_CICLOVIAS, modelo=None,
+                 usar_cache=True, previsoes=None):
+    """
+    Atualiza a tabela de risco com as previsões e ciclovias atuais. Com
+    `usar_cache`, ciclovias do mesmo ponto de previsão (vetores de features
+    iguais) são pontuadas uma única vez. `previsoes`: DataFrame já no formato
+    de `carregar_previsoes` (por padrão, lido de `diretorio_raw`).
+    """
+    modelo = modelo or carregar_modelo(nome_modelo)
+    if usar_cache and not isinstance(modelo, ModeloComCache):
+        modelo = ModeloComCache(modelo)
+    if previsoes is None:
+        previsoes = carregar_previsoes(diretorio_raw)
+    entradas = pd.concat([
+        montar_entradas(carregar_ciclovias(caminho_ciclovias), previsoes,
+                        carregar_ou_construir_indice(diretorio_raw)),
+        entradas_pontos_grade(previsoes),
+    ], ignore_index=True)
+    with TabelaRisco(caminho_tabela) as tabela:
+        resumo = tabela.atualizar(entradas, modelo)
+    print(f"Tabela de risco atualizada ({modelo.nome} v{modelo.versao}): "
+          f"{resumo['pontuadas']} pontuadas, {resumo['mantidas']} mantidas, "
+          f"{resumo['removidas']} removidas -> {caminho_tabela}")
+    if isinstance(modelo, ModeloComCache):
+        metricas = modelo.cache.metricas()
+        print(f"Cache: {metricas['linhas']} linhas, {metricas['faltas']} previsões no modelo "
+              f"({100 * metricas['taxa_economia']:.1f}% evitadas)")
+    return resumo
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+"""
+Risco agregado por rota (sequência ordenada de ciclovias e/ou pontos GPS).
+
+Lê a tabela materializada por `materialize.py` para uma matriz densa
+trecho × hora (uma linha por ciclovia e uma por ponto de previsão, as linhas
+'@location_id' usadas pelos pontos GPS) e pré-calcula, ao longo das horas,
+somas de prefixo e uma sparse table de máximos. Assim, cada consulta de rota custa um gather de
+k linhas, e o resumo da janela de horas sai em O(1) por trecho.
+
+Uso (a partir da raiz do projeto):
+    python -m src.scoring.routes --partida 18 --duracao 2 \\
+        "Av. Afonso Pena - Belo Horizonte" "Av. Carandaí - Belo Horizonte" "-19.93, -43.93"
+"""
+
+import argparse
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from src.prepocessing.spatial_index import carregar_ou_construir_indice, parse_coordenadas
+from src.scoring.tabela import CAMINHO_TABELA, PREFIXO_PONTO_GRADE
+
+
+class MatrizRisco:
+    """Risco pré-calculado por trecho e hora, com agregados de prefixo ao longo das horas."""
+
+    def __init__(self, tabela, indice=None):
+        """
+        `tabela`: DataFrame com logradouro, hora e risco (formato da tabela
+        `risco`, incluindo as linhas '@location_id' de cada ponto de grade).
+        `indice`: IndiceGrade para resolver pontos GPS (opcional).
+        """
+        self.horas = np.array(sorted(tabela['hora'].unique()))
+        self.horas_do_dia = np.array([int(h[11:13]) for h in self.horas])
+        pos_hora = {h: i for i, h in enumerate(self.horas)}
+
+        eh_ponto = tabela['logradouro'].str.startswith(PREFIXO_PONTO_GRADE)
+        # Ciclovias primeiro, depois os pontos de grade
+        ruas = list(tabela.loc[~eh_ponto, 'logradouro'].unique())
+        self.n_ruas = len(ruas)
+        self.nomes = ruas + list(tabela.loc[eh_ponto, 'logradouro'].unique())
+        self.posicao = {nome: i for i, nome in enumerate(self.nomes)}
+        self._posicao_normalizada = {nome.casefold(): i for i, nome in enumerate(self.nomes)}
+
+        self.risco = np.full((len(self.nomes), len(self.horas)), np.nan)
+        linhas = tabela['logradouro'].map(self.posicao).to_numpy()
+        colunas = tabela['hora'].map(pos_hora).to_numpy()
+        self.risco[linhas, colunas] = tabela['risco'].to_numpy()
+
+        self.indice = indice
+        self._preparar_agregados()
+
+    @classmethod
+    def da_tabela(cls, caminho=CAMINHO_TABELA, indice=None):
+        with sqlite3.connect(caminho) as conexao:
+            tabela = pd.read_sql_query("SELECT logradouro, hora, risco FROM risco", conexao)
+        if tabela.empty:
+            raise ValueError(f"Tabela de risco vazia: {caminho} (rode `python -m src.scoring.materialize`)")
+        return cls(tabela, indice)
+
+    def _preparar_agregados(self):
+        validos = ~np.isnan(self.risco)
+        n_pontos, n_horas = self.risco.shape
+        # Somas de prefixo: soma/contagem de [a, b) = prefixo[:, b] - prefixo[:, a]
+        self.soma_prefixo = np.zeros((n_pontos, n_horas + 1))
+        self.soma_prefixo[:, 1:] = np.cumsum(np.where(validos, self.risco, 0.0), axis=1)
+        self.contagem_prefixo = np.zeros((n_pontos, n_horas + 1), dtype=np.int64)
+        self.contagem_prefixo[:, 1:] = np.cumsum(validos, axis=1)
+        # Sparse table: maximos[j][:, i] = máximo de [i, i + 2^j)
+        self.maximos = [np.where(validos, self.risco, -np.inf)]
+        largura = 1
+        while 2 * largura <= n_horas:
+            anterior = self.maximos[-1]
+            self.maximos.append(np.maximum(anterior[:, :-largura], anterior[:, largura:]))
+            largura *= 2
+
+    # ------------------------------------------------------------------ #
+    # Resolução de trechos e horários
+    # ------------------------------------------------------------------ #
+
+    def _resolver_trecho(self, trecho):
+        if isinstance(trecho, str):
+            pos = self.posicao.get(trecho, self._posicao_normalizada.get(trecho.casefold()))
+            if pos is None:
+                raise KeyError(f"Ciclovia sem risco materializado: {trecho}")
+            return pos
+        if self.indice is None:
+            raise ValueError("Pontos GPS exigem um IndiceGrade (parâmetro `indice`)")
+        lat, lon = trecho
+        location_id = self.indice.mais_proximo(lat, lon)[0][0]
+        pos = self.posicao.get(f"{PREFIXO_PONTO_GRADE}{location_id}")
+        if pos is None:
+            raise KeyError(f"Ponto de previsão sem risco materializado: {location_id} "
+                           "(rode `python -m src.scoring.materialize`)")
+        return pos
+
+    def resolver_trechos(self, trechos):
+        """Posições na matriz para uma lista de nomes de ciclovia e/ou tuplas (lat, lon)."""
+        return np.array([self._resolver_trecho(t) for t in trechos], dtype=np.int64)
+
+    def posicao_hora(self, partida):
+        """
+        Índice da hora da previsão que contém `partida` (hora do dia ou
+        'YYYY-MM-DDTHH:MM'): uma partida às 07:30 começa na hora das 07:00.
+        """
+        if isinstance(partida, (int, np.integer)) or str(partida).isdigit():
+            candidatas = np.flatnonzero(self.horas_do_dia == int(partida))
+            if not len(candidatas):
+                raise KeyError(f"Hora {partida} fora da previsão")
+            return int(candidatas[0])
+        partida = str(partida)
+        pos = int(np.searchsorted(self.horas, partida, side='right')) - 1
+        if pos < 0:
+            raise KeyError(f"Partida {partida} antes do início da previsão ({self.horas[0]})")
+        # As horas são cheias ('YYYY-MM-DDTHH:00'): a de `pos` contém a partida
+        # se as duas tiverem a mesma data e hora
+        if partida[:13] != self.horas[pos][:13]:
+            if pos == len(self.horas) - 1:
+                raise KeyError(f"Partida {partida} após o fim da previsão ({self.horas[-1]})")
+            raise KeyError(f"Partida {partida} sem previsão para a hora")
+        return pos
+
+    # ------------------------------------------------------------------ #
+    # Consultas
+    # ------------------------------------------------------------------ #
+
+    def maximo_janela(self, posicoes, inicio, fim):
+        """Máximo de cada trecho em [inicio, fim) em O(1) pela sparse table."""
+        nivel = int(np.log2(fim - inicio))
+        tabela = self.maximos[nivel]
+        return np.maximum(tabela[posicoes, inicio], tabela[posicoes, fim - (1 << nivel)])
+
+    def media_janela(self, posicoes, inicio, fim):
+        """Soma e contagem de cada trecho em [inicio, fim) pelas somas de prefixo."""
+        soma = self.soma_prefixo[posicoes, fim] - self.soma_prefixo[posicoes, inicio]
+        contagem = self.contagem_prefixo[posicoes, fim] - self.contagem_prefixo[posicoes, inicio]
+        return soma, contagem
+
+    def risco_rota(self, trechos, partida, duracao_h=1):
+        """
+        Risco hora a hora ao longo da rota, a partir da partida e por `duracao_h`
+        horas (limitado ao fim da previsão). Retorna um dicionário com, por hora,
+        o pior trecho e a média dos trechos, e o resumo da janela inteira.
+        """
+        posicoes = trechos if isinstance(trechos, np.ndarray) else self.resolver_trechos(trechos)
+        inicio = self.posicao_hora(partida)
+        fim = min(inicio + max(int(duracao_h), 1), len(self.horas))
+
+        bloco = self.risco[posicoes, inicio:fim]
+        validos = ~np.isnan(bloco)
+        n_validos = validos.sum(axis=0)
+        com_dado = n_validos > 0
+        risco_max = np.where(com_dado, np.where(validos, bloco, -np.inf).max(axis=0), np.nan)
+        risco_medio = np.where(com_dado, np.where(validos, bloco, 0.0).sum(axis=0)
+                               / np.maximum(n_validos, 1), np.nan)
+
+        maximo = self.maximo_janela(posicoes, inicio, fim).max()
+        soma, contagem = self.media_janela(posicoes, inicio, fim)
+        pior = int(np.nanargmax(risco_max)) if com_dado.any() else None
+        return {
+            'horas': self.horas[inicio:fim].tolist(),
+            'risco_max': risco_max.tolist(),
+            'risco_medio': risco_medio.tolist(),
+            'pior_hora': None if pior is None else str(self.horas[inicio + pior]),
+            'pior_trecho': None if pior is None else self.nomes[posicoes[int(np.nanargmax(bloco[:, pior]))]],
+            'risco_max_janela': float(maximo) if np.isfinite(maximo) else None,
+            'risco_medio_janela': float(soma.sum() / contagem.sum()) if contagem.sum() else None,
+        }
+
+
+def carregar_matriz(caminho_tabela=CAMINHO_TABELA, com_indice=True):
+    """MatrizRisco da tabela materializada, com o índice espacial para pontos GPS."""
+    indice = carregar_ou_construir_indice() if com_indice else None
+    return MatrizRisco.da_tabela(caminho_tabela, indice)
+
+
+def interpretar_trecho(texto):
+    """'lat, lon' vira tupla (lat, lon); qualquer outro texto é nome de ciclovia."""
+    coords = parse_coordenadas(pd.Series([texto])).iloc[0]
+    if coords.notna().all():
+        return float(coords['latitude']), float(coords['longitude'])
+    return texto
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Risco hora a hora ao longo de uma rota.")
+    parser.add_argument('trechos', nargs='+', help="nomes de ciclovia ou coordenadas 'lat, lon'")
+    parser.add_argument('--partida', required=True, help="hora do dia (ex.: 18) ou 'YYYY-MM-DDTHH:MM'")
+    parser.add_argument('--duracao', type=int, default=1, help="horas a partir da partida")
+    parser.add_argument('--tabela', default=CAMINHO_TABELA)
+    args = parser.parse_args()
+
+    matriz = carregar_matriz(args.tabela)
+    resultado = matriz.risco_rota([interpretar_trecho(t) for t in args.trechos],
+                                  args.partida, args.duracao)
+    print(pd.DataFrame({'hora': resultado['horas'], 'risco_max': resultado['risco_max'],
+                        'risco_medio': resultado['risco_medio']}).to_string(index=False))
+    print(f"\nPior hora: {resultado['pior_hora']} (trecho: {resultado['pior_trecho']})")
+    print(f"Risco máximo na janela: {resultado['risco_max_janela']}")
+    print(f"Risco médio na janela: {resultado['risco_medio_janela']}")
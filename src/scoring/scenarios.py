@@ -0,0 +1,273 @@
+"""
+Gerador de cenários "e se" para os três modelos.
+
+Gera grades densas sobre as 6 features (cartesiana ou Latin hypercube, com
+milhões de pontos), pontua em blocos vetorizados com todos os modelos de
+uma vez e acumula, para cada par de features, uma superfície de risco médio
+por modelo e um mapa de discordância: a fração de pontos em que os modelos
+não concordam se o risco é pelo menos Médio (ver LIMIARES_NAO_SEGURO).
+O resultado é salvo em um `.npz` compacto (float32) e um resumo JSON com a
+vazão de cada modelo em pontos por segundo.
+
+Uso (a partir da raiz do projeto):
+    python -m src.scoring.scenarios --modo cartesiano --pontos 12      # 6 × 12^5 ≈ 1,5 milhão
+    python -m src.scoring.scenarios --modo lhs --n 2000000 --modelos arvore logistica
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+
+from src.models.registry import DIRETORIO_MODELOS, FEATURES, MODELOS, carregar_modelo
+
+# --- CONFIGURAÇÕES ---
+DIRETORIO_SAIDA = os.path.join('data', 'processed', 'cenarios')
+TAMANHO_BLOCO = 250_000
+BINS_PADRAO = 32
+
+# Intervalos (mín, máx) de cada feature; weather_code é inteiro
+INTERVALOS = {
+    'weather_code': (0, 5),
+    'wind_speed_10m': (0.0, 60.0),
+    'precipitation': (0.0, 25.0),
+    'sensacao_termica': (5.0, 40.0),
+    'chuva_acumulada_3h': (0.0, 60.0),
+    'rajada_maxima_3h': (0.0, 80.0),
+}
+FEATURES_INTEIRAS = {'weather_code'}
+
+# Os riscos não estão na mesma escala (árvore: classes 0/0.5/1; logística:
+# P(Médio ou Alto); MLP: regressão sobre 0/0.5/1), então a discordância compara
+# a única decisão que os três expressam: risco >= Médio ("não seguro"), cada um
+# no seu próprio corte (árvore: classe Médio; logística: THRESHOLD_PADRAO;
+# MLP: fronteira Baixo/Médio de categorizar_risco)
+LIMIARES_NAO_SEGURO = {'arvore': 0.5, 'logistica': 0.5, 'mlp': 0.25}
+ESCALA_DISCORDANCIA = ("fração dos pontos do bin em que os modelos divergem sobre risco >= Médio "
+                       "(0 = todos concordam, 1 = divergem em todos)")
+
+
+# ============================================================================ #
+# GERADORES DE PONTOS (em blocos, sem materializar a grade inteira)
+# ============================================================================ #
+
+def _valores_eixo(feature, n_pontos, intervalos):
+    lo, hi = intervalos[feature]
+    if feature in FEATURES_INTEIRAS:
+        return np.arange(int(lo), int(hi) + 1, dtype=float)
+    return np.linspace(lo, hi, n_pontos)
+
+
+def grade_cartesiana(pontos_por_feature=10, intervalos=INTERVALOS, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Produto cartesiano das 6 features (features inteiras usam todos os seus
+    valores). Gera blocos (n, 6) calculando as coordenadas por unravel_index.
+    """
+    eixos = [_valores_eixo(f, pontos_por_feature, intervalos) for f in FEATURES]
+    forma = tuple(len(e) for e in eixos)
+    total = int(np.prod(forma))
+    for inicio in range(0, total, tamanho_bloco):
+        indices = np.unravel_index(np.arange(inicio, min(inicio + tamanho_bloco, total)), forma)
+        yield np.column_stack([eixo[idx] for eixo, idx in zip(eixos, indices)])
+
+
+def latin_hypercube(n, intervalos=INTERVALOS, tamanho_bloco=TAMANHO_BLOCO, seed=42):
+    """Amostra Latin hypercube de n pontos (um estrato por ponto em cada feature)."""
+    rng = np.random.default_rng(seed)
+    permutacoes = [rng.permutation(n) for _ in FEATURES]
+    for inicio in range(0, n, tamanho_bloco):
+        fim = min(inicio + tamanho_bloco, n)
+        colunas = []
+        for feature, perm in zip(FEATURES, permutacoes):
+            u = (perm[inicio:fim] + rng.random(fim - inicio)) / n
+            lo, hi = intervalos[feature]
+            if feature in FEATURES_INTEIRAS:
+                colunas.append(np.floor(lo + u * (hi - lo + 1)))
+            else:
+                colunas.append(lo + u * (hi - lo))
+        yield np.column_stack(colunas)
+
+
+def total_pontos(modo, pontos_por_feature=10, n=1_000_000, intervalos=INTERVALOS):
+    if modo == 'lhs':
+        return n
+    return int(np.prod([len(_valores_eixo(f, pontos_por_feature, intervalos)) for f in FEATURES]))
+
+
+# ============================================================================ #
+# SUPERFÍCIES DE RISCO E DISCORDÂNCIA
+# ============================================================================ #
+
+class Superficies:
+    """Acumula, por par de features, soma e contagem de risco em bins 2D."""
+
+    def __init__(self, nomes_modelos, bins=BINS_PADRAO, intervalos=INTERVALOS):
+        desconhecidos = set(nomes_modelos) - set(LIMIARES_NAO_SEGURO)
+        if desconhecidos:
+            raise ValueError(f"Sem limiar de risco para: {', '.join(sorted(desconhecidos))}")
+        self.nomes_modelos = list(nomes_modelos)
+        self.intervalos = intervalos
+        self.bins = {f: (int(intervalos[f][1] - intervalos[f][0]) + 1 if f in FEATURES_INTEIRAS else bins)
+                     for f in FEATURES}
+        self.pares = list(itertools.combinations(range(len(FEATURES)), 2))
+        self.contagem = {}
+        self.soma = {}
+        self.discordancia = {}
+        for i, j in self.pares:
+            tamanho = self.bins[FEATURES[i]] * self.bins[FEATURES[j]]
+            self.contagem[(i, j)] = np.zeros(tamanho)
+            self.discordancia[(i, j)] = np.zeros(tamanho)
+            for nome in self.nomes_modelos:
+                self.soma[(nome, i, j)] = np.zeros(tamanho)
+
+    def _bin(self, X, col):
+        feature = FEATURES[col]
+        lo, hi = self.intervalos[feature]
+        n_bins = self.bins[feature]
+        if feature in FEATURES_INTEIRAS:
+            idx = np.round(X[:, col] - lo)
+        else:
+            idx = np.floor((X[:, col] - lo) / (hi - lo) * n_bins)
+        return np.clip(idx, 0, n_bins - 1).astype(np.int64)
+
+    def acumular(self, X, riscos):
+        """`riscos`: dicionário nome do modelo → array com o risco de cada linha de X."""
+        bins_col = [self._bin(X, c) for c in range(len(FEATURES))]
+        # Decisão "risco >= Médio" de cada modelo; discorda quem não é unânime
+        decisoes = np.column_stack([riscos[n] >= LIMIARES_NAO_SEGURO[n] for n in self.nomes_modelos])
+        amplitude = (decisoes.any(axis=1) & ~decisoes.all(axis=1)).astype(float)
+        for i, j in self.pares:
+            tamanho = len(self.contagem[(i, j)])
+            plano = bins_col[i] * self.bins[FEATURES[j]] + bins_col[j]
+            self.contagem[(i, j)] += np.bincount(plano, minlength=tamanho)
+            self.discordancia[(i, j)] += np.bincount(plano, weights=amplitude, minlength=tamanho)
+            for nome in self.nomes_modelos:
+                self.soma[(nome, i, j)] += np.bincount(plano, weights=riscos[nome], minlength=tamanho)
+
+    def como_arrays(self):
+        """Médias por bin (NaN onde não houve pontos), em float32, prontas para np.savez."""
+        arrays = {}
+        for i, j in self.pares:
+            fi, fj = FEATURES[i], FEATURES[j]
+            forma = (self.bins[fi], self.bins[fj])
+            contagem = self.contagem[(i, j)]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                for nome in self.nomes_modelos:
+                    media = self.soma[(nome, i, j)] / contagem
+                    arrays[f"risco__{nome}__{fi}__{fj}"] = media.reshape(forma).astype(np.float32)
+                discord = self.discordancia[(i, j)] / contagem
+            arrays[f"discordancia__{fi}__{fj}"] = discord.reshape(forma).astype(np.float32)
+        for f in FEATURES:
+            lo, hi = self.intervalos[f]
+            arrays[f"limites__{f}"] = (np.arange(lo, hi + 2, dtype=np.float32) - 0.5
+                                       if f in FEATURES_INTEIRAS
+                                       else np.linspace(lo, hi, self.bins[f] + 1, dtype=np.float32))
+        return arrays
+
+
+# ============================================================================ #
+# EXECUÇÃO
+# ============================================================================ #
+
+def executar_cenarios(modelos, blocos, bins=BINS_PADRAO, intervalos=INTERVALOS, total=None):
+    """
+    Pontua cada bloco com todos os modelos, acumulando superfícies e o tempo
+    de previsão de cada um. Retorna (Superficies, resumo).
+    """
+    superficies = Superficies([m.nome for m in modelos], bins, intervalos)
+    tempos = {m.nome: 0.0 for m in modelos}
+    n_pontos = 0
+    inicio_total = time.perf_counter()
+    for X in blocos:
+        riscos = {}
+        for modelo in modelos:
+            inicio = time.perf_counter()
+            riscos[modelo.nome] = np.asarray(modelo.prever_risco(X), dtype=float)
+            tempos[modelo.nome] += time.perf_counter() - inicio
+        superficies.acumular(X, riscos)
+        n_pontos += len(X)
+        if total:
+            print(f"  {n_pontos:,}/{total:,} pontos ({100 * n_pontos / total:.0f}%)", end='\r')
+    if total:
+        print()
+
+    resumo = {
+        'pontos': n_pontos,
+        'tempo_total_s': time.perf_counter() - inicio_total,
+        'modelos': {
+            m.nome: {
+                'versao': m.versao,
+                'tempo_previsao_s': tempos[m.nome],
+                'pontos_por_s': n_pontos / tempos[m.nome] if tempos[m.nome] else None,
+            } for m in modelos
+        },
+    }
+    return superficies, resumo
+
+
+def salvar_resultados(superficies, resumo, diretorio=DIRETORIO_SAIDA):
+    os.makedirs(diretorio, exist_ok=True)
+    caminho_npz = os.path.join(diretorio, 'superficies.npz')
+    arrays = superficies.como_arrays()
+    np.savez_compressed(caminho_npz, **arrays)
+    # Onde os modelos mais discordam, por par: centro do bin e fração de divergência nele
+    maximos = {}
+    for i, j in superficies.pares:
+        fi, fj = FEATURES[i], FEATURES[j]
+        mapa = arrays[f"discordancia__{fi}__{fj}"]
+        if not np.isfinite(mapa).any():
+            continue
+        bi, bj = np.unravel_index(np.nanargmax(mapa), mapa.shape)
+        li, lj = arrays[f"limites__{fi}"], arrays[f"limites__{fj}"]
+        maximos[f"{fi}__{fj}"] = {
+            fi: float((li[bi] + li[bi + 1]) / 2), fj: float((lj[bj] + lj[bj + 1]) / 2),
+            'discordancia': float(mapa[bi, bj]),
+        }
+    i, j = superficies.pares[0]
+    contagem = superficies.contagem[(i, j)].sum()
+    resumo = {**resumo,
+              'escala_discordancia': {
+                  'descricao': ESCALA_DISCORDANCIA,
+                  'limiares_nao_seguro': {n: LIMIARES_NAO_SEGURO[n] for n in superficies.nomes_modelos},
+              },
+              'discordancia_media': float(superficies.discordancia[(i, j)].sum() / contagem) if contagem else None,
+              'discordancia_maxima_por_par': maximos}
+    with open(os.path.join(diretorio, 'resumo.json'), 'w', encoding='utf-8') as f:
+        json.dump(resumo, f, indent=2, ensure_ascii=False)
+    print(f"Superfícies salvas em {caminho_npz}")
+    return resumo
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Superfícies de risco e discordância entre modelos.")
+    parser.add_argument('--modo', choices=['cartesiano', 'lhs'], default='cartesiano')
+    parser.add_argument('--pontos', type=int, default=10,
+                        help="pontos por feature contínua no modo cartesiano")
+    parser.add_argument('--n', type=int, default=1_000_000, help="número de pontos no modo lhs")
+    parser.add_argument('--bloco', type=int, default=TAMANHO_BLOCO)
+    parser.add_argument('--bins', type=int, default=BINS_PADRAO)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--modelos', nargs='*', help="padrão: todos os modelos salvos")
+    parser.add_argument('--saida', default=DIRETORIO_SAIDA)
+    args = parser.parse_args()
+
+    nomes = args.modelos or [n for n in MODELOS
+                             if os.path.exists(os.path.join(DIRETORIO_MODELOS, n + '.pkl'))]
+    if not nomes:
+        raise SystemExit("Nenhum modelo salvo (rode `python -m src.models.registry`)")
+    modelos = [carregar_modelo(n) for n in nomes]
+
+    total = total_pontos(args.modo, args.pontos, args.n)
+    if args.modo == 'lhs':
+        blocos = latin_hypercube(args.n, tamanho_bloco=args.bloco, seed=args.seed)
+    else:
+        blocos = grade_cartesiana(args.pontos, tamanho_bloco=args.bloco)
+    print(f"Pontuando {total:,} cenários ({args.modo}) com: {', '.join(nomes)}")
+
+    superficies, resumo = executar_cenarios(modelos, blocos, args.bins, total=total)
+    resumo = salvar_resultados(superficies, {'modo': args.modo, **resumo}, args.saida)
+    for nome, info in resumo['modelos'].items():
+        print(f"{nome}: {info['pontos_por_s']:,.0f} pontos/s")
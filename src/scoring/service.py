@@ -0,0 +1,384 @@
+"""
+Serviço HTTP local de pontuação de risco.
+
+Carrega os modelos salvos uma única vez na inicialização e agrupa requisições
+concorrentes em micro-lotes, de forma que cada modelo faz uma previsão
+vetorizada por lote em vez de uma por requisição.
+
+Uso (a partir da raiz do projeto):
+    python -m src.scoring.service --modelos arvore logistica --porta 8000
+
+Endpoints:
+    GET  /saude     -> modelos carregados e suas versões
+    GET  /metricas  -> latência (p50/p90/p99), vazão, tamanho médio dos lotes e cache
+    POST /prever    -> {"modelo": "arvore", "linhas": [{...features...}, ...]}
+                       {"modelo": "arvore", "linhas": [[6 valores], ...]}
+                       {"modelo": "arvore", "logradouros": ["Av. ..."], "hora": 18}
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from src.models.registry import DIRETORIO_MODELOS, FEATURES, MODELOS, carregar_modelo
+from src.scoring.cache import CAPACIDADE_PADRAO, CachePrevisoes, ModeloComCache
+
+# --- CONFIGURAÇÕES ---
+HOST_PADRAO = '127.0.0.1'
+PORTA_PADRAO = 8000
+MAX_LOTE = 4096          # linhas por previsão vetorizada
+ESPERA_MAX_MS = 2.0      # tempo máximo aguardando outras requisições para o lote
+JANELA_LATENCIAS = 10000 # últimas requisições usadas nos percentis
+
+
+# ============================================================================ #
+# MÉTRICAS
+# ============================================================================ #
+
+class Metricas:
+    """Contadores de vazão e janela de latências, seguros entre threads."""
+
+    def __init__(self, janela=JANELA_LATENCIAS):
+        self._lock = threading.Lock()
+        self._latencias_ms = deque(maxlen=janela)
+        self.inicio = time.perf_counter()
+        self.requisicoes = 0
+        self.erros = 0
+        self.linhas = 0
+        self.lotes = 0
+        self.linhas_em_lotes = 0
+
+    def registrar_requisicao(self, latencia_ms, linhas, erro=False):
+        with self._lock:
+            self._latencias_ms.append(latencia_ms)
+            self.requisicoes += 1
+            self.linhas += linhas
+            self.erros += int(erro)
+
+    def registrar_lote(self, linhas):
+        with self._lock:
+            self.lotes += 1
+            self.linhas_em_lotes += linhas
+
+    def resumo(self):
+        with self._lock:
+            latencias = np.array(self._latencias_ms)
+            decorrido = max(time.perf_counter() - self.inicio, 1e-9)
+            p50, p90, p99 = (np.percentile(latencias, [50, 90, 99]) if len(latencias) else (0.0,) * 3)
+            return {
+                'requisicoes': self.requisicoes,
+                'erros': self.erros,
+                'linhas': self.linhas,
+                'lotes': self.lotes,
+                'tamanho_medio_lote': self.linhas_em_lotes / self.lotes if self.lotes else 0.0,
+                'requisicoes_por_s': self.requisicoes / decorrido,
+                'linhas_por_s': self.linhas / decorrido,
+                'latencia_ms': {'p50': float(p50), 'p90': float(p90), 'p99': float(p99)},
+                'tempo_ativo_s': decorrido,
+            }
+
+
+# ============================================================================ #
+# MICRO-LOTES
+# ============================================================================ #
+
+class MicroLote:
+    """
+    Fila de previsões de um modelo. Uma thread dedicada junta as requisições
+    que chegam em até `espera_max_ms` (ou até `max_lote` linhas), faz uma
+    única chamada a `modelo.prever_risco` e devolve a fatia de cada uma.
+    """
+
+    def __init__(self, modelo, metricas, max_lote=MAX_LOTE, espera_max_ms=ESPERA_MAX_MS):
+        self.modelo = modelo
+        self.metricas = metricas
+        self.max_lote = max_lote
+        self.espera_max_s = espera_max_ms / 1000.0
+        self._fila = queue.Queue()
+        threading.Thread(target=self._executar, name=f"lote-{modelo.nome}", daemon=True).start()
+
+    def prever(self, X):
+        futuro = Future()
+        self._fila.put((np.asarray(X, dtype=float), futuro))
+        return futuro.result()
+
+    def _executar(self):
+        while True:
+            pedidos = [self._fila.get()]
+            n_linhas = len(pedidos[0][0])
+            prazo = time.perf_counter() + self.espera_max_s
+            while n_linhas < self.max_lote:
+                restante = prazo - time.perf_counter()
+                if restante <= 0:
+                    break
+                try:
+                    pedido = self._fila.get(timeout=restante)
+                except queue.Empty:
+                    break
+                pedidos.append(pedido)
+                n_linhas += len(pedido[0])
+
+            try:
+                riscos = self.modelo.prever_risco(np.vstack([X for X, _ in pedidos]))
+            except Exception as e:
+                for _, futuro in pedidos:
+                    futuro.set_exception(e)
+                continue
+            self.metricas.registrar_lote(n_linhas)
+            inicio = 0
+            for X, futuro in pedidos:
+                futuro.set_result(riscos[inicio:inicio + len(X)])
+                inicio += len(X)
+
+
+# ============================================================================ #
+# FEATURES POR CICLOVIA
+# ============================================================================ #
+
+class FeaturesCiclovias:
+    """Features da previsão por (logradouro, hora), montadas uma vez na inicialização."""
+
+    def __init__(self, entradas):
+        self.matriz = entradas[FEATURES].to_numpy(dtype=float)
+        self._por_hora = {}
+        self._por_hora_do_dia = {}
+        for i, (logradouro, hora) in enumerate(zip(entradas['logradouro'], entradas['hora'])):
+            self._por_hora[(logradouro, hora)] = i
+            self._por_hora_do_dia.setdefault((logradouro, int(hora[11:13])), i)
+
+    @classmethod
+    def carregar(cls):
+        from src.prepocessing.spatial_index import carregar_ou_construir_indice
+        from src.prepocessing.preprocess import carregar_previsoes
+        from src.scoring.materialize import carregar_ciclovias, montar_entradas
+        return cls(montar_entradas(carregar_ciclovias(), carregar_previsoes(), carregar_ou_construir_indice()))
+
+    def indices(self, logradouros, hora):
+        """Índices na matriz (None para ciclovias/horas sem previsão)."""
+        if isinstance(hora, (int, np.integer)) or str(hora).isdigit():
+            tabela, chave = self._por_hora_do_dia, int(hora)
+        else:
+            tabela, chave = self._por_hora, str(hora)
+        return [tabela.get((logradouro, chave)) for logradouro in logradouros]
+
+
+# ============================================================================ #
+# SERVIDOR HTTP
+# ============================================================================ #
+
+class ErroRequisicao(Exception):
+    def __init__(self, mensagem, status=400):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class ServicoRisco:
+    """Modelos carregados, filas de micro-lote e métricas do serviço."""
+
+    def __init__(self, modelos, ciclovias=None, max_lote=MAX_LOTE, espera_max_ms=ESPERA_MAX_MS,
+                 cache=None):
+        self.metricas = Metricas()
+        self.cache = cache
+        if cache is not None:
+            modelos = [ModeloComCache(m, cache) for m in modelos]
+        self.modelos = {m.nome: m for m in modelos}
+        self.lotes = {m.nome: MicroLote(m, self.metricas, max_lote, espera_max_ms) for m in modelos}
+        self.ciclovias = ciclovias
+
+    def resumo_metricas(self):
+        resumo = self.metricas.resumo()
+        if self.cache is not None:
+            resumo['cache'] = self.cache.metricas()
+        return resumo
+
+    def saude(self):
+        return {'status': 'ok', 'modelos': {n: m.versao for n, m in self.modelos.items()},
+                'ciclovias': self.ciclovias is not None}
+
+    @staticmethod
+    def _linha_objeto(linha):
+        # Sem preenchimento: uma chave digitada errado viraria um vetor de zeros com risco plausível
+        desconhecidas = sorted(set(linha) - set(FEATURES))
+        faltantes = [f for f in FEATURES if f not in linha]
+        if desconhecidas or faltantes:
+            partes = ([f"desconhecidas: {', '.join(desconhecidas)}"] if desconhecidas else []) + \
+                     ([f"faltando: {', '.join(faltantes)}"] if faltantes else [])
+            raise ErroRequisicao(f"Features inválidas na linha ({'; '.join(partes)})")
+        nao_numericas = [f for f in FEATURES
+                         if isinstance(linha[f], bool) or not isinstance(linha[f], (int, float))]
+        if nao_numericas:
+            raise ErroRequisicao(f"Valores não numéricos em: {', '.join(nao_numericas)}")
+        return [linha[f] for f in FEATURES]
+
+    def _matriz_linhas(self, linhas):
+        if isinstance(linhas, dict):
+            linhas = [linhas]
+        if not isinstance(linhas, list) or not linhas:
+            raise ErroRequisicao("'linhas' deve ser um objeto ou uma lista não vazia")
+        if all(isinstance(l, dict) for l in linhas):
+            return np.array([self._linha_objeto(l) for l in linhas], dtype=float)
+        erro = ErroRequisicao(f"Cada linha deve ter {len(FEATURES)} valores: {', '.join(FEATURES)}")
+        try:
+            X = np.asarray(linhas, dtype=float)
+        except (TypeError, ValueError):
+            raise erro
+        # Uma lista plana de 6 valores é uma única linha; qualquer outra forma é rejeitada
+        if X.ndim == 1 and X.shape[0] == len(FEATURES):
+            X = X.reshape(1, -1)
+        if X.ndim != 2 or X.shape[1] != len(FEATURES):
+            raise erro
+        return X
+
+    def prever(self, corpo):
+        if not isinstance(corpo.get('modelo', ''), str):
+            raise ErroRequisicao("'modelo' deve ser um texto")
+        nome = corpo.get('modelo', next(iter(self.modelos), None))
+        if nome not in self.lotes:
+            raise ErroRequisicao(f"Modelo não carregado: {nome}", status=404)
+
+        if 'logradouros' in corpo:
+            if self.ciclovias is None:
+                raise ErroRequisicao("Previsões por ciclovia indisponíveis neste serviço", status=404)
+            logradouros = corpo['logradouros']
+            if isinstance(logradouros, str):
+                logradouros = [logradouros]
+            if (not isinstance(logradouros, list) or not logradouros
+                    or not all(isinstance(l, str) for l in logradouros)):
+                raise ErroRequisicao("'logradouros' deve ser um texto ou uma lista não vazia de textos")
+            if 'hora' not in corpo:
+                raise ErroRequisicao("Informe 'hora' junto com 'logradouros'")
+            indices = self.ciclovias.indices(logradouros, corpo['hora'])
+            encontrados = [i for i in indices if i is not None]
+            riscos = iter(self.lotes[nome].prever(self.ciclovias.matriz[encontrados])
+                          if encontrados else [])
+            resultado = [None if i is None else float(next(riscos)) for i in indices]
+            return {'modelo': nome, 'versao': self.modelos[nome].versao,
+                    'logradouros': logradouros, 'risco': resultado}, len(encontrados)
+
+        if 'linhas' not in corpo:
+            raise ErroRequisicao("Informe 'linhas' ou 'logradouros' + 'hora'")
+        X = self._matriz_linhas(corpo['linhas'])
+        riscos = self.lotes[nome].prever(X)
+        return {'modelo': nome, 'versao': self.modelos[nome].versao,
+                'risco': riscos.astype(float).tolist()}, len(X)
+
+
+class ServidorRisco(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # o padrão (5) recusa conexões sob carga concorrente
+
+
+def criar_handler(servico):
+    class Handler(BaseHTTPRequestHandler):
+        def _responder(self, status, conteudo):
+            dados = json.dumps(conteudo, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+
+        def do_GET(self):
+            if self.path == '/saude':
+                self._responder(200, servico.saude())
+            elif self.path == '/metricas':
+                self._responder(200, servico.resumo_metricas())
+            else:
+                self._responder(404, {'erro': f"Rota não encontrada: {self.path}"})
+
+        def do_POST(self):
+            if self.path != '/prever':
+                self._responder(404, {'erro': f"Rota não encontrada: {self.path}"})
+                return
+            inicio = time.perf_counter()
+            linhas, status = 0, 200
+            try:
+                try:
+                    tamanho = int(self.headers.get('Content-Length', 0))
+                except ValueError:
+                    raise ErroRequisicao("Content-Length inválido")
+                if tamanho < 0:
+                    raise ErroRequisicao("Content-Length inválido")
+                corpo = json.loads(self.rfile.read(tamanho) or b'{}')
+                if not isinstance(corpo, dict):
+                    raise ErroRequisicao("O corpo deve ser um objeto JSON")
+                resposta, linhas = servico.prever(corpo)
+            except json.JSONDecodeError as e:
+                status, resposta = 400, {'erro': f"JSON inválido: {e}"}
+            except ErroRequisicao as e:
+                status, resposta = e.status, {'erro': str(e)}
+            except Exception as e:
+                status, resposta = 500, {'erro': str(e)}
+            self._responder(status, resposta)
+            servico.metricas.registrar_requisicao(
+                (time.perf_counter() - inicio) * 1000, linhas, erro=status != 200
+            )
+
+        def log_message(self, formato, *args):
+            pass  # uma linha por requisição custaria mais que a própria previsão
+
+    return Handler
+
+
+def iniciar_servico(nomes_modelos=None, host=HOST_PADRAO, porta=PORTA_PADRAO,
+                    diretorio_modelos=DIRETORIO_MODELOS, com_ciclovias=True,
+                    max_lote=MAX_LOTE, espera_max_ms=ESPERA_MAX_MS, capacidade_cache=CAPACIDADE_PADRAO):
+    """
+    Carrega os modelos (por padrão, todos os salvos) e devolve o servidor pronto.
+    `capacidade_cache=0` desliga o cache de previsões.
+    """
+    if not nomes_modelos:
+        nomes_modelos = [n for n in MODELOS
+                         if os.path.exists(os.path.join(diretorio_modelos, n + '.pkl'))]
+    if not nomes_modelos:
+        raise FileNotFoundError(
+            f"Nenhum modelo salvo em {diretorio_modelos} (rode `python -m src.models.registry`)"
+        )
+    modelos = [carregar_modelo(n, diretorio_modelos) for n in nomes_modelos]
+
+    ciclovias = None
+    if com_ciclovias:
+        try:
+            ciclovias = FeaturesCiclovias.carregar()
+        except FileNotFoundError as e:
+            print(f"Aviso: previsões por ciclovia indisponíveis ({e})")
+
+    cache = CachePrevisoes(capacidade_cache) if capacidade_cache else None
+    servico = ServicoRisco(modelos, ciclovias, max_lote, espera_max_ms, cache)
+    servidor = ServidorRisco((host, porta), criar_handler(servico))
+    servidor.servico = servico
+    return servidor
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serviço HTTP local de pontuação de risco.")
+    parser.add_argument('--modelos', nargs='*', help="padrão: todos os modelos salvos")
+    parser.add_argument('--host', default=HOST_PADRAO)
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--max-lote', type=int, default=MAX_LOTE)
+    parser.add_argument('--espera-ms', type=float, default=ESPERA_MAX_MS)
+    parser.add_argument('--cache', type=int, default=CAPACIDADE_PADRAO,
+                        help="capacidade do cache de previsões (0 desliga)")
+    parser.add_argument('--sem-ciclovias', action='store_true',
+                        help="não carrega as previsões por ciclovia")
+    args = parser.parse_args()
+
+    servidor = iniciar_servico(args.modelos, args.host, args.porta, com_ciclovias=not args.sem_ciclovias,
+                               max_lote=args.max_lote, espera_max_ms=args.espera_ms,
+                               capacidade_cache=args.cache)
+    print(f"Serviço de risco em http://{args.host}:{args.porta} "
+          f"(modelos: {', '.join(servidor.servico.modelos)})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nEncerrando serviço.")
+    finally:
+        servidor.server_close()
@@ -0,0 +1,161 @@
+"""
+Tabela SQLite de risco por ciclovia e hora, gravada por `materialize.py`.
+
+Fica em um módulo separado, que só importa a biblioteca padrão, para que
+consultas pontuais e `--help` abram sem carregar pandas e scikit-learn;
+`estado_atual`, `atualizar` e `como_dataframe` importam o que usam. Pelo
+mesmo motivo a linha de comando de `materialize.py` (e de `mobike.py score`)
+mora aqui: `materialize` só é importado quando a tabela vai ser atualizada.
+
+Uso (a partir da raiz do projeto):
+    python -m src.scoring.materialize --modelo arvore
+    python -m src.scoring.materialize --consultar "Av. Afonso Pena - Belo Horizonte" 18
+"""
+
+import argparse
+import numbers
+import os
+import sqlite3
+from datetime import datetime
+
+# --- CONFIGURAÇÕES ---
+CAMINHO_TABELA = os.path.join('data', 'processed', 'risco_ciclovias.sqlite')
+# Linhas '@location_id' guardam o risco do próprio ponto de grade (rotas por GPS)
+PREFIXO_PONTO_GRADE = '@'
+
+
+class TabelaRisco:
+    """Tabela SQLite `risco`, com chave primária (logradouro, hora)."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS risco (
+            logradouro    TEXT    NOT NULL,
+            hora          TEXT    NOT NULL,
+            location_id   TEXT    NOT NULL,
+            modelo        TEXT    NOT NULL,
+            versao_modelo TEXT    NOT NULL,
+            hash_entrada  INTEGER NOT NULL,
+            risco         REAL    NOT NULL,
+            atualizado_em TEXT    NOT NULL,
+            PRIMARY KEY (logradouro, hora)
+        ) WITHOUT ROWID
+    """
+
+    def __init__(self, caminho=CAMINHO_TABELA):
+        if os.path.dirname(caminho):
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute(self.SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def fechar(self):
+        self.conexao.close()
+
+    def estado_atual(self):
+        import pandas as pd
+        return pd.read_sql_query(
+            "SELECT logradouro, hora, modelo, versao_modelo, hash_entrada FROM risco", self.conexao
+        )
+
+    def atualizar(self, entradas, modelo, remover_ausentes=True):
+        """
+        Pontua apenas as linhas novas ou cujo hash de entrada/modelo mudou.
+        Retorna um dicionário com a contagem de linhas pontuadas, mantidas e removidas.
+        """
+        from src.models.registry import FEATURES
+        atual = self.estado_atual()
+        # Int64 (nullable) evita que o merge converta os hashes para float
+        comparacao = entradas.merge(atual.astype({'hash_entrada': 'Int64'}),
+                                    on=['logradouro', 'hora'], how='left', suffixes=('', '_salvo'))
+        alteradas = (
+            (comparacao['hash_entrada_salvo'] != comparacao['hash_entrada']).fillna(True)
+            | (comparacao['modelo'] != modelo.nome)
+            | (comparacao['versao_modelo'] != modelo.versao)
+        ).to_numpy(dtype=bool)
+        pendentes = entradas[alteradas]
+
+        removidas = 0
+        with self.conexao:
+            if len(pendentes):
+                riscos = modelo.prever_risco(pendentes[FEATURES])
+                agora = datetime.now().isoformat()
+                linhas = zip(
+                    pendentes['logradouro'], pendentes['hora'], pendentes['location_id'],
+                    [modelo.nome] * len(pendentes), [modelo.versao] * len(pendentes),
+                    pendentes['hash_entrada'].astype(int), riscos.astype(float),
+                    [agora] * len(pendentes),
+                )
+                self.conexao.executemany("""
+                    INSERT INTO risco VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (logradouro, hora) DO UPDATE SET
+                        location_id = excluded.location_id, modelo = excluded.modelo,
+                        versao_modelo = excluded.versao_modelo, hash_entrada = excluded.hash_entrada,
+                        risco = excluded.risco, atualizado_em = excluded.atualizado_em
+                """, linhas)
+
+            if remover_ausentes and len(atual):
+                chaves = set(zip(entradas['logradouro'], entradas['hora']))
+                ausentes = [k for k in zip(atual['logradouro'], atual['hora']) if k not in chaves]
+                self.conexao.executemany("DELETE FROM risco WHERE logradouro = ? AND hora = ?", ausentes)
+                removidas = len(ausentes)
+
+        return {'pontuadas': int(alteradas.sum()), 'mantidas': int((~alteradas).sum()),
+                'removidas': removidas}
+
+    def consultar(self, logradouro, hora):
+        """
+        Risco da ciclovia em uma hora. `hora` pode ser o horário completo
+        ('2025-11-28T18:00') ou só a hora do dia (18), que retorna a primeira
+        ocorrência dessa hora na previsão. Retorna None se não houver linha.
+        """
+        if isinstance(hora, numbers.Integral):
+            linha = self.conexao.execute(
+                "SELECT risco FROM risco WHERE logradouro = ? AND substr(hora, 12, 2) = ? "
+                "ORDER BY hora LIMIT 1", (logradouro, f"{int(hora):02d}")
+            ).fetchone()
+        else:
+            linha = self.conexao.execute(
+                "SELECT risco FROM risco WHERE logradouro = ? AND hora = ?", (logradouro, hora)
+            ).fetchone()
+        return None if linha is None else linha[0]
+
+    def como_dataframe(self):
+        import pandas as pd
+        return pd.read_sql_query("SELECT * FROM risco ORDER BY logradouro, hora", self.conexao)
+
+
+def imprimir_consulta(caminho, logradouro, hora):
+    """Imprime o risco de `logradouro` em `hora` (hora do dia, ex.: '18', ou horário completo)."""
+    with TabelaRisco(caminho) as tabela:
+        risco = tabela.consultar(logradouro, int(hora) if hora.isdigit() else hora)
+    print("Sem registro." if risco is None else f"Risco: {risco:.3f}")
+    return risco
+
+
+def criar_parser(prog=None):
+    parser = argparse.ArgumentParser(prog=prog, description="Materializa o risco por ciclovia e por hora.")
+    parser.add_argument('--modelo', default='arvore', help="arvore, logistica ou mlp")
+    parser.add_argument('--tabela', default=CAMINHO_TABELA)
+    parser.add_argument('--sem-cache', action='store_true', help="pontua todas as linhas no modelo")
+    parser.add_argument('--consultar', nargs=2, metavar=('LOGRADOURO', 'HORA'),
+                        help="consulta a tabela em vez de atualizá-la (hora do dia ou 'YYYY-MM-DDTHH:MM')")
+    return parser
+
+
+def main(argv=None, prog=None):
+    args = criar_parser(prog).parse_args(argv)
+    if args.consultar:
+        imprimir_consulta(args.tabela, *args.consultar)
+        return
+    from src.scoring.materialize import materializar
+    materializar(args.modelo, args.tabela, usar_cache=not args.sem_cache)
+
+
+if __name__ == '__main__':
+    main()
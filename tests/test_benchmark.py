@@ -0,0 +1,69 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.benchmark.run_benchmarks import LIMIAR_REGRESSAO, comparar, executar, salvar_relatorio
+from src.benchmark.synthetic import (CLASSES, CODIGOS_POR_CLASSE, PROPORCAO_CLASSES, gerar_ciclovias,
+                                     gerar_historico)
+
+
+def test_mesma_seed_gera_os_mesmos_dados():
+    pd.testing.assert_frame_equal(gerar_ciclovias(2000, seed=3), gerar_ciclovias(2000, seed=3))
+    pd.testing.assert_frame_equal(gerar_historico(3, 48, seed=3), gerar_historico(3, 48, seed=3))
+    assert not gerar_ciclovias(2000, seed=3).equals(gerar_ciclovias(2000, seed=4))
+
+
+def test_ciclovias_seguem_as_proporcoes_do_csv_original():
+    dados = gerar_ciclovias(100_000, com_identificacao=False)
+    proporcoes = dados['rótulo'].value_counts(normalize=True).reindex(CLASSES)
+    np.testing.assert_allclose(proporcoes, PROPORCAO_CLASSES, atol=0.01)
+    for classe in CLASSES:
+        codigos, probs = CODIGOS_POR_CLASSE[classe]
+        da_classe = dados.loc[dados['rótulo'] == classe, 'weather_code']
+        frequencias = da_classe.value_counts(normalize=True).reindex(codigos, fill_value=0.0)
+        np.testing.assert_allclose(frequencias, probs, atol=0.02)
+    chuva = dados['precipitation'] > 0
+    razao = dados.loc[chuva, 'chuva_acumulada_3h'].sum() / dados.loc[chuva, 'precipitation'].sum()
+    assert razao == pytest.approx(3.0, rel=0.02)
+    assert (dados['rajada_maxima_3h'].sum() / dados['wind_speed_10m'].sum()) == pytest.approx(1.37, rel=0.02)
+
+
+def test_historico_no_formato_da_api():
+    historico = gerar_historico(2, 72, inicio='2025-03-01T06:00')
+    assert len(historico) == 2 * 72
+    assert list(historico['location_id'].unique()) == ['location_001', 'location_002']
+    assert historico['time'].iloc[0] == pd.Timestamp('2025-03-01T06:00')
+    chuva_forte = historico['precipitation'] >= 5
+    assert (historico.loc[chuva_forte, 'weather_code'] == 5).all()
+    assert historico['relative_humidity_2m'].between(15, 100).all()
+
+
+def relatorio(tempos):
+    resultados = [{'linhas': n, 'estagio': estagio, 'tempo_s': t} for (n, estagio), t in tempos.items()]
+    resultados.append({'linhas': 1000, 'estagio': 'treino_mlp', 'pulado': 'tensorflow indisponível'})
+    return {'data': '2025-01-01T00:00:00', 'versao': {'git': 'abc1234'}, 'resultados': resultados}
+
+
+def test_comparar_sinaliza_lentidao_acima_do_limiar(capsys):
+    anterior = relatorio({(1000, 'carga'): 1.0, (1000, 'limpeza'): 1.0, (1000, 'features'): 1.0,
+                          (10000, 'carga'): 2.0})
+    atual = relatorio({(1000, 'carga'): 1.25, (1000, 'limpeza'): 1.15, (1000, 'features'): 0.5,
+                       (100000, 'carga'): 9.0})
+    assert LIMIAR_REGRESSAO == 1.20
+    regressoes = comparar(atual, anterior)
+    assert regressoes == [{'linhas': 1000, 'estagio': 'carga', 'razao_tempo': 1.25}]
+    assert 'REGRESSÃO' in capsys.readouterr().out
+    # Com um limiar menor, a limpeza (15% mais lenta) também entra
+    assert [r['estagio'] for r in comparar(atual, anterior, limiar=1.10)] == ['carga', 'limpeza']
+
+
+def test_executar_e_salvar_relatorio(tmp_path):
+    relatorio_atual = executar([300], ['carga', 'features', 'predicao_arvore'], memoria=False, seed=1)
+    estagios = [r['estagio'] for r in relatorio_atual['resultados']]
+    assert estagios == ['carga', 'features', 'predicao_arvore']
+    assert all(r['linhas'] == 300 and r['tempo_s'] >= 0 for r in relatorio_atual['resultados'])
+    caminho = salvar_relatorio(relatorio_atual, str(tmp_path))
+    with open(caminho, encoding='utf-8') as f:
+        assert json.load(f)['config']['seed'] == 1
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.registry import FEATURES
+from src.scoring.cache import CachePrevisoes, ModeloComCache
+
+
+class ModeloPonderado:
+    """Risco contínuo, sensível a qualquer casa decimal; registra cada chamada."""
+
+    nome = 'logistica'
+    versao = 'teste'
+
+    def __init__(self):
+        self.chamadas = []
+
+    def prever_risco(self, X):
+        X = np.asarray(X, dtype=float)
+        self.chamadas.append(X.copy())
+        return X @ np.linspace(0.1, 0.6, len(FEATURES))
+
+
+def vetor(sensacao):
+    return [3, 10.2, 0.0, sensacao, 0.4, 12.7]
+
+
+def test_chave_padrao_e_exata():
+    modelo = ModeloPonderado()
+    cache = CachePrevisoes()
+    X = np.array([vetor(25.43125), vetor(25.43127), vetor(25.43125)])
+    riscos = cache.prever_risco(modelo, X)
+    np.testing.assert_array_equal(riscos, X @ np.linspace(0.1, 0.6, len(FEATURES)))
+    assert len(cache) == 2
+
+
+def test_duplicatas_do_lote_vao_uma_vez_ao_modelo():
+    modelo = ModeloPonderado()
+    cache = CachePrevisoes()
+    X = np.array([vetor(20.0), vetor(21.0), vetor(20.0), vetor(21.0), vetor(22.0)])
+    riscos = cache.prever_risco(modelo, X)
+    assert len(modelo.chamadas) == 1
+    np.testing.assert_array_equal(modelo.chamadas[0][:, 3], [20.0, 21.0, 22.0])
+    assert riscos[0] == riscos[2] and riscos[1] == riscos[3]
+    metricas = cache.metricas()
+    assert (metricas['linhas'], metricas['linhas_unicas'], metricas['faltas'], metricas['acertos']) == (5, 3, 3, 0)
+
+
+
+def test_deduplicacao_nao_depende_de_hash(monkeypatch):
+    # Todo hash colide: a conferência pelos bytes refaz a deduplicação e cada
+    # vetor continua com o seu risco
+    monkeypatch.setattr(pd.util, 'hash_pandas_object',
+                        lambda df, index=False: pd.Series(np.zeros(len(df), dtype=np.uint64)))
+    modelo = ModeloPonderado()
+    cache = CachePrevisoes()
+    X = np.array([vetor(20.0), vetor(np.nextafter(20.0, 21.0)), vetor(21.0), vetor(20.0)])
+    riscos = cache.prever_risco(modelo, X)
+    np.testing.assert_array_equal(riscos, X @ np.linspace(0.1, 0.6, len(FEATURES)))
+    assert riscos[0] != riscos[1]
+    np.testing.assert_array_equal(modelo.chamadas[0], X[:3])  # únicas, na ordem de 1ª aparição
+    assert cache.metricas()['linhas_unicas'] == 3
+
+def test_acertos_nao_chamam_o_modelo():
+    modelo = ModeloPonderado()
+    cache = CachePrevisoes()
+    cache.prever_risco(modelo, [vetor(20.0), vetor(21.0)])
+    cache.prever_risco(modelo, [vetor(21.0), vetor(20.0)])
+    assert len(modelo.chamadas) == 1
+    assert cache.metricas()['acertos'] == 2
+    assert cache.metricas()['taxa_economia'] == 0.5
+
+
+def test_lru_remove_o_menos_usado():
+    modelo = ModeloPonderado()
+    cache = CachePrevisoes(capacidade=2)
+    cache.prever_risco(modelo, [vetor(1.0)])
+    cache.prever_risco(modelo, [vetor(2.0)])
+    cache.prever_risco(modelo, [vetor(1.0)])  # 1.0 passa a ser o mais recente
+    cache.prever_risco(modelo, [vetor(3.0)])  # remove 2.0
+    assert cache.metricas()['remocoes'] == 1
+    modelo.chamadas.clear()
+    cache.prever_risco(modelo, [vetor(1.0), vetor(3.0)])
+    assert modelo.chamadas == []
+    cache.prever_risco(modelo, [vetor(2.0)])
+    assert len(modelo.chamadas) == 1
+
+
+def test_chave_separa_modelos_e_versoes():
+    cache = CachePrevisoes()
+    a, b = ModeloPonderado(), ModeloPonderado()
+    b.versao = 'outra'
+    cache.prever_risco(a, [vetor(20.0)])
+    cache.prever_risco(b, [vetor(20.0)])
+    assert len(cache) == 2 and len(b.chamadas) == 1
+
+
+def test_quantizacao_opcional_compartilha_o_passo():
+    modelo = ModeloPonderado()
+    cache = CachePrevisoes(passos={'sensacao_termica': 0.01})
+    riscos = cache.prever_risco(modelo, [vetor(25.431), vetor(25.434)])
+    assert riscos[0] == riscos[1]
+    assert modelo.chamadas[0][0, 3] == pytest.approx(25.43)
+    with pytest.raises(ValueError):
+        CachePrevisoes(passos={'temperatura': 0.1})
+
+
+def test_modelo_com_cache_mantem_a_interface():
+    modelo = ModeloPonderado()
+    embrulhado = ModeloComCache(modelo)
+    assert (embrulhado.nome, embrulhado.versao) == ('logistica', 'teste')
+    X = np.array([vetor(18.5), vetor(-0.0), vetor(0.0)])
+    np.testing.assert_array_equal(embrulhado.prever_risco(X), modelo.prever_risco(X))
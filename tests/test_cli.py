@@ -0,0 +1,68 @@
+import importlib
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+import mobike
+
+
+@pytest.mark.parametrize('comando', list(mobike.COMANDOS))
+def test_cada_comando_usa_o_parser_do_modulo(comando, capsys):
+    modulo = importlib.import_module(mobike.COMANDOS[comando][0])
+    with pytest.raises(SystemExit) as saida:
+        mobike.main([comando, '--help'])
+    assert saida.value.code == 0
+    ajuda = capsys.readouterr().out
+    assert ajuda.startswith(f"usage: mobike {comando}")
+    opcoes = [o for acao in modulo.criar_parser()._actions for o in acao.option_strings]
+    assert all(opcao in ajuda for opcao in opcoes)
+
+
+def test_bench_aceita_as_mesmas_opcoes_do_modulo(capsys):
+    with pytest.raises(SystemExit):
+        mobike.main(['bench', '--help'])
+    ajuda = capsys.readouterr().out
+    assert '--epocas-mlp' in ajuda and '--seed' in ajuda
+
+
+def test_argumentos_repassados_com_os_fixos(monkeypatch):
+    chamadas = []
+    falso = types.SimpleNamespace(main=lambda argv, prog: chamadas.append((argv, prog)))
+    monkeypatch.setattr(mobike.importlib, 'import_module', lambda nome: falso)
+    mobike.main(['preprocess', '--saida', 'x.csv'])
+    mobike.main(['train', 'arvore', '--dados', 'y.csv'])
+    assert chamadas == [(['--todas', '--saida', 'x.csv'], 'mobike preprocess'),
+                        (['arvore', '--dados', 'y.csv'], 'mobike train')]
+
+
+@pytest.mark.parametrize('argv', [['--help'], ['score', '--help'], ['fetch', '--help'], ['pipeline', '--help'],
+                                  ['score', '--consultar', 'Rua que não existe', '18', '--tabela', ':memory:']])
+def test_ajuda_e_consulta_nao_importam_pandas(argv):
+    codigo = ("import sys, mobike\ntry:\n    mobike.main(sys.argv[1:])\nexcept SystemExit:\n    pass\n"
+              "print([m for m in ('pandas', 'sklearn') if m in sys.modules])")
+    saida = subprocess.run([sys.executable, '-c', codigo, *argv], capture_output=True, text=True, check=True,
+                           cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert saida.stdout.strip().splitlines()[-1] == '[]'
+
+
+def test_preprocess_todas_nao_importa_pipeline_nem_scoring(tmp_path):
+    codigo = ("import sys, mobike\nmobike.main(sys.argv[1:])\n"
+              "print(sorted(m for m in sys.modules if m.startswith(('src.scoring', 'src.pipeline', "
+              "'src.models', 'sklearn'))))")
+    saida = subprocess.run([sys.executable, '-c', codigo, 'preprocess', '--saida', str(tmp_path / 'p.csv')],
+                           capture_output=True, text=True, check=True,
+                           cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert saida.stdout.strip().splitlines()[-1] == '[]'
+    assert (tmp_path / 'p.csv').exists()
+
+
+@pytest.mark.parametrize('script', ['src/prepocessing/preprocess.py', 'src/prepocessing/fetch_weather_data.py'])
+def test_scripts_rodam_pelo_caminho_sem_src(script):
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    saida = subprocess.run([sys.executable, script, '--help'], capture_output=True, text=True, cwd=raiz,
+                           env={**os.environ, 'PYTHONPATH': ''})
+    assert saida.returncode == 0, saida.stderr
+    assert saida.stdout.startswith('usage:')
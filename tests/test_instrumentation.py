@@ -0,0 +1,134 @@
+import json
+import os
+
+import pytest
+
+from src import instrumentation
+from src.instrumentation import anotar, configurar, instrumentado, resumir
+
+
+@pytest.fixture(autouse=True)
+def desligada_ao_fim():
+    yield
+    configurar(memoria=False, modo_perfil='cprofile', diretorio_perfis=instrumentation.DIRETORIO_PERFIS)
+    instrumentation._perfiladores.clear()
+
+
+def ler_jsonl(caminho):
+    with open(caminho, encoding='utf-8') as f:
+        return [json.loads(linha) for linha in f]
+
+
+@instrumentado('fatorial')
+def fatorial(n):
+    return 1 if n <= 1 else n * fatorial(n - 1)
+
+
+@instrumentado('carregar', rotulos=lambda nome, n: {'modelo': nome})
+def carregar(nome, n):
+    anotar(bytes_lidos=10 * n)
+    if n < 0:
+        raise ValueError("n negativo")
+    return list(range(n))
+
+
+def test_recursao_conta_so_a_chamada_externa(tmp_path):
+    destino = tmp_path / 'm.jsonl'
+    configurar(destino=str(destino))
+    assert fatorial(5) == 120
+    registros = ler_jsonl(destino)
+    assert len(registros) == 1
+    assert registros[0]['estagio'] == 'fatorial'
+    assert registros[0]['linhas'] is None  # um int não tem len
+    assert instrumentation._pilha_estagios() == []
+
+
+def test_erro_e_registrado_e_relancado(tmp_path):
+    destino = tmp_path / 'm.jsonl'
+    configurar(destino=str(destino))
+    with pytest.raises(ValueError, match="n negativo"):
+        carregar('arvore', -1)
+    registro, = ler_jsonl(destino)
+    assert registro['erro'] == 'ValueError'
+    assert 'linhas' not in registro
+    assert registro['bytes_lidos'] == -10
+    assert instrumentation._pilha_estagios() == []
+
+
+def test_anotar_rotulos_e_linhas(tmp_path):
+    destino = tmp_path / 'm.jsonl'
+    configurar(destino=str(destino))
+    anotar(bytes_lidos=1)  # fora de um estágio: ignorado
+    assert carregar('logistica', 4) == [0, 1, 2, 3]
+    registro, = ler_jsonl(destino)
+    assert registro['estagio'] == 'carregar'
+    assert registro['modelo'] == 'logistica'
+    assert registro['bytes_lidos'] == 40
+    assert registro['linhas'] == 4
+    assert registro['duracao_s'] >= 0
+    assert {'rss_max_mb', 'ts'} <= set(registro)
+
+
+def test_linhas_personalizadas(tmp_path):
+    destino = tmp_path / 'm.jsonl'
+    configurar(destino=str(destino))
+    contar = instrumentado('contar', linhas=lambda resultado, n: n * 2)(lambda n: None)
+    contar(3)
+    assert ler_jsonl(destino)[0]['linhas'] == 6
+
+
+def test_prometheus_agrega_por_estagio_e_rotulos(tmp_path):
+    destino = tmp_path / 'm.prom'
+    configurar(destino=str(destino))
+    carregar('arvore', 2)
+    carregar('arvore', 3)
+    with pytest.raises(ValueError):
+        carregar('arvore', -1)
+    carregar('a"b', 1)
+    configurar()  # fecha o coletor, que reescreve o arquivo
+
+    texto = destino.read_text(encoding='utf-8')
+    linhas = texto.splitlines()
+    assert '# TYPE mobike_estagio_chamadas_total counter' in linhas
+    assert 'mobike_estagio_chamadas_total{estagio="carregar",modelo="arvore"} 3' in linhas
+    assert 'mobike_estagio_erros_total{estagio="carregar",modelo="arvore"} 1' in linhas
+    assert 'mobike_estagio_linhas_total{estagio="carregar",modelo="arvore"} 5' in linhas
+    assert 'mobike_estagio_bytes_lidos_total{estagio="carregar",modelo="arvore"} 40' in linhas
+    assert 'mobike_estagio_chamadas_total{estagio="carregar",modelo="a\\"b"} 1' in linhas
+    assert '# TYPE mobike_estagio_rss_max_mb gauge' in linhas
+    assert not os.path.exists(str(destino) + '.tmp')
+
+
+def test_desligada_nao_grava_nada(tmp_path):
+    configurar(diretorio_perfis=str(tmp_path / 'perfis'))
+    assert instrumentation._coletor is None
+    assert carregar('arvore', 3) == [0, 1, 2]
+    with pytest.raises(ValueError):
+        carregar('arvore', -1)
+    assert fatorial(4) == 24
+    assert os.listdir(tmp_path) == []
+    assert instrumentation._pilha_estagios() == []
+
+
+def test_perfil_so_do_estagio_escolhido(tmp_path):
+    perfis = tmp_path / 'perfis'
+    configurar(perfil='fatorial', diretorio_perfis=str(perfis))
+    carregar('arvore', 2)
+    assert fatorial(6) == 720
+    arquivos = os.listdir(perfis)
+    assert len(arquivos) == 1
+    assert arquivos[0].startswith('fatorial_') and arquivos[0].endswith('.pstats')
+
+
+def test_resumo_por_estagio_e_modelo(tmp_path):
+    destino = tmp_path / 'm.jsonl'
+    configurar(destino=str(destino))
+    carregar('arvore', 2)
+    carregar('arvore', 4)
+    carregar('logistica', 1)
+    fatorial(3)
+    configurar()
+    resumo = resumir(str(destino))
+    assert resumo.loc[('carregar', 'arvore'), 'chamadas'] == 2
+    assert resumo.loc[('carregar', 'arvore'), 'bytes_lidos'] == 60
+    assert resumo.loc[('fatorial', ''), 'chamadas'] == 1
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from src.models.registry import FEATURES
+from src.prepocessing import spatial_index
+from src.prepocessing.spatial_index import IndiceGrade
+from src.scoring.materialize import hash_features, montar_entradas
+
+
+def previsoes_de(pontos):
+    linhas = []
+    for location_id, lat, lon in pontos:
+        for hora in ('2025-01-01T07:00', '2025-01-01T08:00'):
+            linhas.append({'location_id': location_id, 'grade_lat': lat, 'grade_lon': lon, 'hora': hora,
+                           **{f: 1.0 for f in FEATURES}})
+    return pd.DataFrame(linhas)
+
+
+CICLOVIAS = pd.DataFrame({'NOME_LOGRADOURO': ['Rua Norte', 'Rua Sul'],
+                          'latitude': [-19.80, -20.00], 'longitude': [-43.95, -43.95]})
+PONTOS = [('location_001', -19.81, -43.95), ('location_002', -19.99, -43.95)]
+
+
+def test_hash_ignora_ruido_de_float_em_valores_com_5_casas():
+    # 25.43125 é um empate em 4 casas: 1 ulp para cada lado mudava o arredondamento
+    base = pd.DataFrame([[3, 10.2, 0.0, 25.43125, 0.4, 12.7]], columns=FEATURES)
+    ruidos = [base.copy() for _ in range(2)]
+    ruidos[0]['sensacao_termica'] = np.nextafter(25.43125, 0)
+    ruidos[1]['sensacao_termica'] = np.nextafter(25.43125, 100)
+    assert all(hash_features(r)[0] == hash_features(base)[0] for r in ruidos)
+
+
+def test_hash_distingue_valores_diferentes():
+    df = pd.DataFrame([[3, 10.2, 0.0, 25.43125, 0.4, 12.7],
+                       [3, 10.2, 0.0, 25.43126, 0.4, 12.7]], columns=FEATURES)
+    primeiro, segundo = hash_features(df)
+    assert primeiro != segundo
+
+
+def test_montar_entradas_usa_o_indice_salvo(monkeypatch):
+    indice = IndiceGrade(pd.DataFrame(PONTOS, columns=['location_id', 'latitude', 'longitude']))
+    construidos = []
+    monkeypatch.setattr(spatial_index.IndiceGrade, '__init__',
+                        lambda self, *a, **k: construidos.append(a))
+    entradas = montar_entradas(CICLOVIAS, previsoes_de(PONTOS), indice)
+    assert construidos == []
+    assert dict(zip(entradas['logradouro'], entradas['location_id'])) == {
+        'Rua Norte': 'location_001', 'Rua Sul': 'location_002'}
+    assert len(entradas) == 4
+
+
+def test_indice_de_outra_grade_nao_e_usado():
+    antigo = IndiceGrade(pd.DataFrame([('location_001', -19.99, -43.95)],
+                                      columns=['location_id', 'latitude', 'longitude']))
+    entradas = montar_entradas(CICLOVIAS, previsoes_de(PONTOS), antigo)
+    assert sorted(entradas['location_id'].unique()) == ['location_001', 'location_002']
@@ -0,0 +1,139 @@
+import json
+import os
+import shutil
+
+import pytest
+import requests
+
+from src import pipeline
+from src.pipeline import Estagio, executar
+
+EXECUCOES = []
+
+
+def copiar(origem, destino):
+    EXECUCOES.append(destino)
+    with open(origem) as f:
+        conteudo = f.read()
+    with open(destino, 'w') as f:
+        f.write(conteudo.upper())
+
+
+def falhar():
+    EXECUCOES.append('falha')
+    raise RuntimeError('estágio quebrado')
+
+
+def nao_gerar_nada():
+    EXECUCOES.append('vazio')
+
+
+def estagios():
+    return [
+        Estagio('a', copiar, ['entrada.txt'], ['a.txt'], parametros={'origem': 'entrada.txt', 'destino': 'a.txt'}),
+        Estagio('b', copiar, ['a.txt'], ['b.txt'], depende_de=['a'],
+                parametros={'origem': 'a.txt', 'destino': 'b.txt'}),
+        Estagio('c', copiar, ['outra.txt'], ['c.txt'], parametros={'origem': 'outra.txt', 'destino': 'c.txt'}),
+    ]
+
+
+@pytest.fixture(autouse=True)
+def diretorio(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'entrada.txt').write_text('x')
+    (tmp_path / 'outra.txt').write_text('y')
+    EXECUCOES.clear()
+    return tmp_path
+
+
+def rodar(lista=None, nomes=None, **kwargs):
+    return executar(nomes, estagios=lista or estagios(), paralelo=1, diretorio='pipeline', **kwargs)
+
+
+def status(manifesto):
+    return {nome: r['status'] for nome, r in manifesto['estagios'].items()}
+
+
+def test_segunda_execucao_pula_tudo():
+    assert status(rodar()) == {'a': 'executado', 'b': 'executado', 'c': 'executado'}
+    EXECUCOES.clear()
+    assert status(rodar()) == {'a': 'pulado', 'b': 'pulado', 'c': 'pulado'}
+    assert EXECUCOES == []
+
+
+def test_mudanca_de_entrada_roda_so_o_que_depende_dela(diretorio):
+    rodar()
+    EXECUCOES.clear()
+    (diretorio / 'entrada.txt').write_text('mudou')
+    manifesto = rodar()
+    assert status(manifesto) == {'a': 'executado', 'b': 'executado', 'c': 'pulado'}
+    assert manifesto['estagios']['a']['motivo'] == 'entradas mudaram: entrada.txt'
+    assert (diretorio / 'b.txt').read_text() == 'MUDOU'
+
+
+def test_saida_apagada_ou_alterada_roda_de_novo(diretorio):
+    rodar()
+    (diretorio / 'c.txt').unlink()
+    (diretorio / 'b.txt').write_text('editado à mão')
+    assert status(rodar()) == {'a': 'pulado', 'b': 'executado', 'c': 'executado'}
+
+
+def test_forcar_e_selecao_com_dependencias():
+    rodar()
+    EXECUCOES.clear()
+    assert status(rodar(nomes=['b'], forcar=['a'])) == {'a': 'executado', 'b': 'pulado'}
+    with pytest.raises(ValueError):
+        rodar(nomes=['nao_existe'])
+
+
+def test_erro_cancela_dependentes_e_nao_grava_estado():
+    lista = [
+        Estagio('a', falhar, ['entrada.txt'], ['a.txt']),
+        Estagio('b', copiar, ['a.txt'], ['b.txt'], depende_de=['a'],
+                parametros={'origem': 'a.txt', 'destino': 'b.txt'}),
+        Estagio('c', nao_gerar_nada, ['outra.txt'], ['c.txt']),
+    ]
+    manifesto = rodar(lista)
+    assert status(manifesto) == {'a': 'erro', 'b': 'cancelado', 'c': 'erro'}
+    assert 'estágio quebrado' in manifesto['estagios']['a']['erro']
+    assert 'nenhuma saída gerada' in manifesto['estagios']['c']['erro']
+    with open(os.path.join('pipeline', 'estado.json')) as f:
+        assert json.load(f)['estagios'] == {}
+    EXECUCOES.clear()
+    rodar(lista)
+    assert EXECUCOES == ['falha', 'vazio']  # falhas não são puladas na próxima execução
+
+
+def test_validade_expirada_roda_de_novo(monkeypatch):
+    lista = [Estagio('a', copiar, ['entrada.txt'], ['a.txt'], validade_s=60,
+                     parametros={'origem': 'entrada.txt', 'destino': 'a.txt'})]
+    rodar(lista)
+    assert status(rodar(lista)) == {'a': 'pulado'}
+    relogio = pipeline.time.time()
+    monkeypatch.setattr(pipeline.time, 'time', lambda: relogio + 120)
+    assert status(rodar(lista)) == {'a': 'executado'}
+
+
+def test_coleta_sem_nenhuma_estacao_falha(diretorio, monkeypatch):
+    os.makedirs('src/prepocessing')
+    shutil.copy(os.path.join(os.path.dirname(__file__), '..', 'src', 'prepocessing', 'config_stations.json'),
+                'src/prepocessing/config_stations.json')
+    os.makedirs('data/raw')
+    (diretorio / 'data' / 'raw' / 'location_001_raw.json').write_text('{}')  # coleta antiga
+
+    def sem_rede(*args, **kwargs):
+        raise requests.exceptions.ConnectionError('sem rede')
+
+    monkeypatch.setattr(requests, 'get', sem_rede)
+    lista = [e for e in pipeline.ESTAGIOS if e.nome == 'coleta']
+    manifesto = rodar(lista)
+    assert manifesto['estagios']['coleta']['status'] == 'erro'
+    assert 'Nenhuma das' in manifesto['estagios']['coleta']['erro']
+
+
+def test_materializacao_depende_do_codigo_que_pontua_e_grava():
+    materializacao = next(e for e in pipeline.ESTAGIOS if e.nome == 'materializacao')
+    for codigo in ('src/scoring/tabela.py', 'src/models/registry.py', 'src/models/decision_tree.py'):
+        assert codigo in materializacao.entradas
+    assert all(os.path.exists(os.path.join(os.path.dirname(__file__), '..', c))
+               for c in materializacao.entradas if c.startswith('src/'))
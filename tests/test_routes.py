@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.scoring.routes import MatrizRisco
+
+HORAS = [f"2025-01-01T{h:02d}:00" for h in range(7, 20)]
+
+
+class IndiceFixo:
+    """Resolve qualquer coordenada pela latitude: > -19.9 é location_001, senão location_002."""
+
+    def mais_proximo(self, lat, lon):
+        return np.array(['location_001' if lat > -19.9 else 'location_002'], dtype=object), np.array([0.1])
+
+
+@pytest.fixture
+def matriz():
+    rng = np.random.default_rng(7)
+    linhas = []
+    for nome in ('Rua A', 'Rua B', 'Rua C', '@location_001', '@location_002'):
+        for hora in HORAS:
+            if nome == 'Rua C' and hora.endswith(('10:00', '11:00')):
+                continue  # buracos na previsão
+            linhas.append({'logradouro': nome, 'hora': hora, 'risco': float(rng.random())})
+    return MatrizRisco(pd.DataFrame(linhas), IndiceFixo())
+
+
+def test_sparse_table_e_prefixos_batem_com_forca_bruta(matriz):
+    posicoes = matriz.resolver_trechos(['Rua A', 'Rua B', 'Rua C', '@location_002'])
+    n = len(matriz.horas)
+    for inicio in range(n):
+        for fim in range(inicio + 1, n + 1):
+            bloco = matriz.risco[posicoes, inicio:fim]
+            esperado_max = np.where(np.isnan(bloco), -np.inf, bloco).max(axis=1)
+            np.testing.assert_array_equal(matriz.maximo_janela(posicoes, inicio, fim), esperado_max)
+            soma, contagem = matriz.media_janela(posicoes, inicio, fim)
+            np.testing.assert_allclose(soma, np.nansum(bloco, axis=1))
+            np.testing.assert_array_equal(contagem, (~np.isnan(bloco)).sum(axis=1))
+
+
+def test_risco_rota_resume_a_janela(matriz):
+    resultado = matriz.risco_rota(['Rua A', 'rua c'], '2025-01-01T09:00', duracao_h=4)
+    assert resultado['horas'] == HORAS[2:6]
+    bloco = matriz.risco[matriz.resolver_trechos(['Rua A', 'Rua C']), 2:6]
+    np.testing.assert_allclose(resultado['risco_max'], np.nanmax(bloco, axis=0))
+    assert resultado['risco_max_janela'] == pytest.approx(np.nanmax(bloco))
+    assert resultado['risco_medio_janela'] == pytest.approx(np.nanmean(bloco))
+    assert resultado['pior_hora'] == HORAS[2 + int(np.nanargmax(np.nanmax(bloco, axis=0)))]
+
+
+def test_ponto_gps_usa_a_linha_do_ponto_de_grade(matriz):
+    # location_002 não tem ciclovia associada, mas tem risco próprio
+    pos = matriz.resolver_trechos([(-20.0, -43.9)])[0]
+    assert matriz.nomes[pos] == '@location_002'
+    assert matriz.risco_rota([(-20.0, -43.9)], 7)['horas'] == HORAS[:1]
+
+
+def test_partida_fora_da_previsao(matriz):
+    assert matriz.posicao_hora('2025-01-01T07:00') == 0
+    assert matriz.posicao_hora('2025-01-01T07:30') == 0  # a hora das 07:00 contém a partida
+    assert matriz.posicao_hora('2025-01-01T19:59') == len(HORAS) - 1
+    assert matriz.posicao_hora(19) == len(HORAS) - 1
+    for partida in ('2024-12-31T23:00', '2025-01-01T06:59', '2025-01-01T20:00', 3):
+        with pytest.raises(KeyError):
+            matriz.posicao_hora(partida)
+
+
+def test_trecho_desconhecido(matriz):
+    with pytest.raises(KeyError):
+        matriz.resolver_trechos(['Rua Z'])
+    sem_indice = MatrizRisco(pd.DataFrame({'logradouro': ['Rua A'], 'hora': HORAS[:1], 'risco': [0.5]}))
+    with pytest.raises(ValueError):
+        sem_indice.resolver_trechos([(-19.9, -43.9)])
@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from src.models.registry import FEATURES
+from src.scoring.scenarios import Superficies
+
+
+def test_discordancia_compara_a_decisao_risco_medio_ou_mais():
+    superficies = Superficies(['arvore', 'logistica', 'mlp'], bins=4)
+    X = np.zeros((4, len(FEATURES)))
+    riscos = {
+        # escalas diferentes, mesma decisão nas duas primeiras linhas
+        'arvore': np.array([0.5, 0.0, 1.0, 0.0]),
+        'logistica': np.array([0.9, 0.1, 0.2, 0.1]),
+        'mlp': np.array([0.3, 0.2, 0.8, 0.6]),
+    }
+    superficies.acumular(X, riscos)
+    par = superficies.pares[0]
+    assert superficies.contagem[par].sum() == 4
+    assert superficies.discordancia[par].sum() == 2
+    assert superficies.como_arrays()[f"discordancia__{FEATURES[0]}__{FEATURES[1]}"][0, 0] == 0.5
+
+
+def test_modelo_sem_limiar_e_rejeitado():
+    with pytest.raises(ValueError):
+        Superficies(['arvore', 'outro'])
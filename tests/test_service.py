@@ -0,0 +1,155 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.registry import FEATURES
+from src.scoring.service import (ErroRequisicao, FeaturesCiclovias, Metricas, MicroLote,
+                                 ServicoRisco, ServidorRisco, criar_handler)
+
+
+class ModeloSoma:
+    """Risco = soma das features; registra o tamanho de cada chamada."""
+
+    nome = 'arvore'
+    versao = 'teste'
+
+    def __init__(self):
+        self.chamadas = []
+
+    def prever_risco(self, X):
+        X = np.asarray(X, dtype=float)
+        self.chamadas.append(len(X))
+        return X.sum(axis=1)
+
+
+@pytest.fixture
+def servico():
+    entradas = pd.DataFrame({
+        'logradouro': ['Rua A', 'Rua A', 'Rua B'],
+        'hora': ['2025-01-01T17:00', '2025-01-01T18:00', '2025-01-01T18:00'],
+        **{f: [1.0, 2.0, 3.0] for f in FEATURES},
+    })
+    return ServicoRisco([ModeloSoma()], FeaturesCiclovias(entradas), espera_max_ms=1.0)
+
+
+@pytest.mark.parametrize('linhas', [
+    [[1, 2, 3], [4, 5, 6]],        # 6 valores no total, mas linhas de 3
+    [[1, 2, 3, 4]] * 3,            # 12 valores não viram 2 linhas de 6
+    [1, 2, 3, 4, 5],               # lista plana sem 6 valores
+    [[1, 2, 3, 4, 5, 6], [1, 2]],  # linhas irregulares
+    [['a'] * 6],
+    [],
+])
+def test_linhas_malformadas_sao_rejeitadas(servico, linhas):
+    with pytest.raises(ErroRequisicao) as erro:
+        servico.prever({'linhas': linhas})
+    assert erro.value.status == 400
+
+
+def test_lista_plana_de_seis_valores_e_uma_linha(servico):
+    resposta, n = servico.prever({'linhas': [1, 2, 3, 4, 5, 6]})
+    assert n == 1
+    assert resposta['risco'] == [21.0]
+
+
+def test_linhas_como_objetos_usam_o_nome_das_features(servico):
+    linha = dict(zip(FEATURES, [1, 2, 3, 4, 5, 6.5]))
+    resposta, n = servico.prever({'linhas': [linha, {**linha, 'weather_code': 0}]})
+    assert n == 2
+    assert resposta['risco'] == [21.5, 20.5]
+
+
+@pytest.mark.parametrize('alteracao', [
+    {'wind_speed': 99},                  # chave desconhecida (digitada errado)
+    {'weather_code': 'abc'},             # valor não numérico
+    {'precipitation': None},
+    {'sensacao_termica': True},
+])
+def test_linhas_como_objetos_invalidas_sao_rejeitadas(servico, alteracao):
+    linha = {**dict(zip(FEATURES, [1] * 6)), **alteracao}
+    with pytest.raises(ErroRequisicao) as erro:
+        servico.prever({'linhas': [linha]})
+    assert erro.value.status == 400
+
+
+def test_linha_objeto_sem_todas_as_features_e_rejeitada(servico):
+    with pytest.raises(ErroRequisicao) as erro:
+        servico.prever({'linhas': [{'weather_code': 2}]})
+    assert erro.value.status == 400 and 'faltando' in str(erro.value)
+
+
+@pytest.mark.parametrize('modelo', [['x'], {'a': 1}, 3])
+def test_modelo_que_nao_e_texto_e_rejeitado(servico, modelo):
+    with pytest.raises(ErroRequisicao) as erro:
+        servico.prever({'modelo': modelo, 'linhas': [1] * 6})
+    assert erro.value.status == 400
+
+
+@pytest.mark.parametrize('logradouros', [[['x']], [1], [], {'a': 1}])
+def test_logradouros_invalidos_sao_rejeitados(servico, logradouros):
+    with pytest.raises(ErroRequisicao) as erro:
+        servico.prever({'logradouros': logradouros, 'hora': 18})
+    assert erro.value.status == 400
+
+
+def test_logradouros_por_hora_do_dia_e_horario_completo(servico):
+    resposta, n = servico.prever({'logradouros': ['Rua A', 'Rua B', 'Rua C'], 'hora': 18})
+    assert resposta['risco'] == [12.0, 18.0, None]
+    assert n == 2
+    resposta, _ = servico.prever({'logradouros': 'Rua A', 'hora': '2025-01-01T17:00'})
+    assert resposta['risco'] == [6.0]
+
+
+def test_micro_lote_devolve_a_fatia_de_cada_pedido():
+    modelo = ModeloSoma()
+    lote = MicroLote(modelo, Metricas(), max_lote=10_000, espera_max_ms=50)
+    pedidos = [np.full((k, len(FEATURES)), float(k)) for k in range(1, 21)]
+    with ThreadPoolExecutor(len(pedidos)) as pool:
+        respostas = list(pool.map(lote.prever, pedidos))
+    for k, riscos in zip(range(1, 21), respostas):
+        np.testing.assert_array_equal(riscos, np.full(k, 6.0 * k))
+    assert sum(modelo.chamadas) == sum(range(1, 21))
+    assert len(modelo.chamadas) < len(pedidos)  # pedidos concorrentes foram agrupados
+
+
+def test_micro_lote_propaga_erro_do_modelo():
+    class ModeloQuebrado(ModeloSoma):
+        def prever_risco(self, X):
+            raise RuntimeError('falhou')
+
+    lote = MicroLote(ModeloQuebrado(), Metricas(), espera_max_ms=1)
+    with pytest.raises(RuntimeError, match='falhou'):
+        lote.prever(np.zeros((1, len(FEATURES))))
+
+
+def test_http_status_das_respostas(servico):
+    servidor = ServidorRisco(('127.0.0.1', 0), criar_handler(servico))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        def post(corpo):
+            conexao = HTTPConnection(*servidor.server_address, timeout=5)
+            conexao.request('POST', '/prever', body=corpo)
+            resposta = conexao.getresponse()
+            return resposta.status, json.loads(resposta.read())
+
+        assert post(json.dumps({'linhas': [[1, 2, 3], [4, 5, 6]]}))[0] == 400
+        assert post(json.dumps({'logradouros': [['x']], 'hora': 18}))[0] == 400
+        assert post('{nao e json')[0] == 400
+        assert post(json.dumps({'modelo': 'mlp', 'linhas': [1] * 6}))[0] == 404
+        assert post(json.dumps({'modelo': ['x'], 'linhas': [1] * 6}))[0] == 400
+        assert post(json.dumps({'linhas': [{'wind_speed': 99}]}))[0] == 400
+        conexao = HTTPConnection(*servidor.server_address, timeout=5)
+        conexao.putrequest('POST', '/prever')
+        conexao.putheader('Content-Length', 'abc')
+        conexao.endheaders()
+        assert conexao.getresponse().status == 400
+        status, corpo = post(json.dumps({'linhas': [[1] * 6, [2] * 6]}))
+        assert status == 200 and corpo['risco'] == [6.0, 12.0]
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from src.prepocessing import spatial_index
+from src.prepocessing.spatial_index import IndiceGrade, parse_coordenadas
+
+
+def pontos_aleatorios(n, rng):
+    return pd.DataFrame({'location_id': [f"location_{i:03d}" for i in range(n)],
+                         'latitude': rng.uniform(-20.1, -19.7, n),
+                         'longitude': rng.uniform(-44.1, -43.8, n)})
+
+
+def test_distancia_direta_bate_com_a_balltree(monkeypatch):
+    rng = np.random.default_rng(3)
+    pontos = pontos_aleatorios(40, rng)
+    direto = IndiceGrade(pontos)
+    monkeypatch.setattr(spatial_index, 'LIMITE_FORCA_BRUTA', 0)
+    arvore = IndiceGrade(pontos)
+    assert direto._arvore is None and arvore._arvore is not None
+
+    lat, lon = rng.uniform(-20.2, -19.6, 5000), rng.uniform(-44.2, -43.7, 5000)
+    lat[7] = np.nan
+    ids_d, dist_d = direto.mais_proximo(lat, lon)
+    ids_a, dist_a = arvore.mais_proximo(lat, lon)
+    assert list(ids_d) == list(ids_a)
+    np.testing.assert_allclose(dist_d, dist_a, rtol=1e-9, equal_nan=True)
+    assert ids_d[7] is None
+
+
+def test_indice_salvo_sem_balltree_nao_importa_sklearn(tmp_path):
+    indice = IndiceGrade(pontos_aleatorios(3, np.random.default_rng(0)), assinatura='x')
+    indice.salvar(str(tmp_path / 'indice.pkl'))
+    carregado = IndiceGrade.carregar(str(tmp_path / 'indice.pkl'))
+    assert carregado._arvore is None
+    assert carregado.mais_proximo(-19.9, -43.9)[0][0] == indice.mais_proximo(-19.9, -43.9)[0][0]
+
+
+def test_parse_coordenadas_invalidas_viram_nan():
+    coords = parse_coordenadas(pd.Series(['-19.9, -43.9', 'abc', '95, 10', None]))
+    assert coords.iloc[0].tolist() == [-19.9, -43.9]
+    assert coords.iloc[1:].isna().all().all()